@@ -3,6 +3,12 @@ class NetworkSettings:
     STARTING_PORT = 5000
     TIMEOUT = 2.0
     MAX_RETRIES = 3
+    POOL_MAX_PER_PEER = 4
+    POOL_IDLE_TIMEOUT = 30.0
+    SERVER_IDLE_TIMEOUT = 60.0
+    MAX_IN_FLIGHT_PER_CONNECTION = 64
+    SERVER_MAX_CONCURRENT_REQUESTS = 64
+    CODECS = ('binary', 'json')
 
 
 class ChordSettings:
@@ -12,14 +18,68 @@ class ChordSettings:
     FIX_FINGERS_INTERVAL = 2
     CHECK_PREDECESSOR_INTERVAL = 2
     REPLICATION_FACTOR = 3
+    SUCCESSOR_LIST_SIZE = 4
+    WRITE_ACK_LEVEL = 'primary'
+    WRITE_QUORUM = 2
+    REPLICA_WRITE_TIMEOUT = 1.0
+    REPLICATION_BATCH_SIZE = 256
+    REPLICATION_FLUSH_INTERVAL = 0.005
+    REPLICATION_QUEUE_LIMIT = 10000
+    REPLICATION_RETRY_DELAY = 0.5
+    REPLICATION_MAX_RETRY_DELAY = 5.0
+    REPLICATION_MAX_ATTEMPTS = 3
+    HEDGE_DELAY = 0.05
+    HEDGE_PERCENTILE = 95
+    HEDGE_MIN_DELAY = 0.005
+    HEDGE_MAX_DELAY = 0.5
+    HEDGE_SAMPLE_SIZE = 256
+    HEDGE_MIN_SAMPLES = 20
+    LOCATION_CACHE_SIZE = 4096
+    LOCATION_CACHE_TTL = 30.0
+    READ_CACHE_ENABLED = False
+    READ_CACHE_BYTES = 16 * 1024 * 1024
+    READ_CACHE_TTL = 5.0
+    READ_CACHE_TRACKED_KEYS = 65536
+    LOOKUP_MODE = 'iterative'
+    LOOKUP_HOP_TIMEOUT = 0.5
+    LOOKUP_MAX_HOPS = 64
+    FINGER_INIT_MODE = 'bulk'
+    FINGER_INIT_CONCURRENCY = 16
+    TRANSFER_BATCH_SIZE = 256
+    TRANSFER_BATCH_BYTES = 1024 * 1024
+    TRANSFER_MAX_RETRIES = 3
+    TRANSFER_RETRY_DELAY = 0.5
+    TRANSFER_COMMIT_HISTORY = 64
+    TRANSFER_ABANDONED_HISTORY = 64
+    TRANSFER_DIGEST_FIRST = True
+    HANDOFF_TTL = 300.0
+    MULTI_BATCH_SIZE = 512
+
+
+class StorageSettings:
+    BACKEND = 'memory'
+    DATA_DIR = 'data'
+    WAL_FSYNC = True
+    GROUP_COMMIT_DELAY = 0.002
+    SNAPSHOT_INTERVAL = 30.0
+    SNAPSHOT_MIN_WAL_BYTES = 4 * 1024 * 1024
+    MEMORY_BUDGET = None
+    MEMORY_POLICY = 'evict_replicas'
+    COMPACT_VALUES = True
+    EXPIRY_SWEEP_INTERVAL = 1.0
+    EXPIRY_BATCH_SIZE = 500
 
 
 class FailureDetectorSettings:
     PING_INTERVAL = 1
     FAILURE_THRESHOLD = 3
     TIMEOUT = 1.0
+    SUSPECT_TTL = 10.0
 
 class SecuritySettings:
     SECRET_KEY = "chord_dht_secret_key_2026"
     ENCRYPTION_ENABLED = True
     SIGNATURE_ENABLED = True
+    SEALED_FRAMES = True
+    SESSION_KEYS = True
+    SESSION_CIPHERS = ('aes-gcm', 'chacha20-poly1305')
@@ -1,32 +1,62 @@
 import asyncio
-from typing import Optional, Any
+import time
+from collections import deque
+from typing import Optional, Any, Deque, Dict, List, Tuple
 from core.NodeRef import NodeRef, RemoteNode
+from fault_tolerance.LivenessTracker import LivenessTracker
 from core.DataStore import DataStore
 from core.FingerTable import FingerTable
 from core.TopologyManager import TopologyManager
 from core.DataTransferManager import DataTransferManager
+from core.ReplicationManager import ReplicationManager
+from core.ReadCache import Peer, ReadCache, ReadSubscriptions
+from network.ConnectionPool import ConnectionPool
+from storage.StorageBackend import create_backend
 from utils.ChordMath import ChordMath
 from config.LoggingConfig import get_logger
 from config.Settings import ChordSettings, NetworkSettings
 
 logger = get_logger("ChordNode")
 
+WRITE_ACK_LEVELS = ('primary', 'quorum', 'all')
+
 
 class ChordNode(NodeRef):
 
-    def __init__(self, ip: str, port: int):
+    def __init__(self, ip: str, port: int, lookup_mode: Optional[str] = None, write_ack_level: Optional[str] = None,
+                 read_cache: Optional[bool] = None, storage: Optional[str] = None):
         node_id = ChordMath.compute_hash(f"{ip}:{port}")
         super().__init__(node_id, ip, port)
-        self.data_store = DataStore()
+        self.data_store = DataStore(create_backend(storage, f"{ip}_{port}"))
         self.finger_table = FingerTable(self)
-        self.topology_manager = TopologyManager(self)
+        self.topology_manager = TopologyManager(self, lookup_mode)
         self.data_transfer_manager = DataTransferManager(self.data_store, self.id)
         self.replication_factor = ChordSettings.REPLICATION_FACTOR
+        self.write_ack_level = write_ack_level or ChordSettings.WRITE_ACK_LEVEL
+        if self.write_ack_level not in WRITE_ACK_LEVELS:
+            raise ValueError(f"Unknown write acknowledgement level: {self.write_ack_level}")
+        self.replication_manager = ReplicationManager()
+        self._read_latencies: Deque[float] = deque(maxlen=ChordSettings.HEDGE_SAMPLE_SIZE)
+        self.read_stats = {'reads': 0, 'hedged': 0, 'replica_hits': 0}
+        read_cache = ChordSettings.READ_CACHE_ENABLED if read_cache is None else read_cache
+        self.read_cache = ReadCache() if read_cache else None
+        self.read_subscriptions = ReadSubscriptions()
+        self._pending_invalidations: Dict[Peer, Dict[str, int]] = {}
+        self._invalidation_task: Optional[asyncio.Task] = None
+        self._resume_task: Optional[asyncio.Task] = None
+        self.data_store.write_observers.append(self._note_local_write)
+        self.data_store.owned_range = self._owned_range
         self.running = True
         logger.info(f"Chord Node created: ID={self.id % 1000 if self.id is not None else None}, {ip}:{port}")
 
     async def stop(self):
         self.running = False
+        self.replication_manager.close()
+        if self._invalidation_task:
+            self._invalidation_task.cancel()
+        if self._resume_task:
+            self._resume_task.cancel()
+        self.data_store.close()
 
     async def create_ring(self):
         if not self.running: return
@@ -35,12 +65,12 @@ class ChordNode(NodeRef):
     async def join(self, bootstrap_ip: str, bootstrap_port: int):
         if not self.running: return
         try:
-            bootstrap_node = RemoteNode(0, bootstrap_ip, bootstrap_port, self.ip, self.port)
+            bootstrap_node = RemoteNode.shared(0, bootstrap_ip, bootstrap_port, self.ip, self.port)
             logger.info(f"Join to ring through bootstrap node {bootstrap_ip}:{bootstrap_port}")
             successor = await bootstrap_node.find_successor(self.id)
             if successor:
                 logger.info(f"Successor found: {successor.id % 1000 if successor.id is not None else None}")
-                self.topology_manager.successor = RemoteNode(
+                self.topology_manager.successor = RemoteNode.shared(
                     successor.id, successor.ip, successor.port, self.ip, self.port
                 )
                 await self.data_transfer_manager.acquire_keys_from_successor(self.topology_manager.successor)
@@ -64,6 +94,16 @@ class ChordNode(NodeRef):
             pass
         except Exception as e:
             logger.error(f"Error during stabilize: {e}")
+        if self.running and self.data_transfer_manager.has_pending() and (self._resume_task is None or self._resume_task.done()):
+            self._resume_task = asyncio.ensure_future(self._resume_handoffs())
+
+    async def _resume_handoffs(self) -> None:
+        try:
+            await self.data_transfer_manager.resume_pending()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        except Exception as e:
+            logger.error(f"Error while resuming handoffs: {e}")
 
     async def fix_fingers(self):
         if not self.running: return
@@ -83,23 +123,37 @@ class ChordNode(NodeRef):
         except Exception as e:
             logger.error(f"Error during check_predecessor: {e}")
 
-    async def store(self, key: str, value: Any) -> bool:
+    async def store(self, key: str, value: Any, use_cache: bool = True, ttl: Optional[float] = None, expires_at: Optional[float] = None,
+                    version: Optional[int] = None) -> bool:
         if not self.running: return False
+        if ttl is not None:
+            expires_at = time.time() + ttl
         try:
             key_hash = ChordMath.compute_hash(key)
-            responsible_node = await self.topology_manager.find_successor(key_hash)
+            if self.read_cache is not None:
+                self.read_cache.discard(key)
+            pred = self.topology_manager.predecessor
+            if pred and ChordMath.in_interval(pred.id, key_hash, self.id):
+                return await self.store_owned(key, value, expires_at, version)
+            responsible_node = await self.topology_manager.find_successor(key_hash, use_cache=use_cache)
 
             if responsible_node:
                 if responsible_node.id == self.id:
-                    self.data_store.store(key, value)
-                    logger.info(f"Key stored '{key}' locally")
-                    await self._replicate_to_successors(key, value)
-                    return True
-                else:
-                    result = await responsible_node.store_key(key, value)
-                    if result:
-                        logger.info(f"Key stored '{key}' to node {responsible_node.port}")
-                    return result
+                    return await self.store_owned(key, value, expires_at, version)
+                status = await responsible_node.store_key_direct(key, value, expires_at, version)
+                if status != 'ok':
+                    self.topology_manager.location_cache.invalidate(responsible_node.id)
+                if status == 'not_owner':
+                    logger.debug(f"Node {responsible_node.port} refused '{key}', looking up its owner again")
+                    responsible_node = await self.topology_manager.find_successor(key_hash, use_cache=False)
+                    if responsible_node is None:
+                        return False
+                    if responsible_node.id == self.id:
+                        return await self.store_owned(key, value, expires_at, version)
+                    status = 'ok' if await responsible_node.store_key(key, value, expires_at, version) else 'error'
+                if status == 'ok':
+                    logger.info(f"Key stored '{key}' to node {responsible_node.port}")
+                return status == 'ok'
             return False
         except (OSError, asyncio.TimeoutError) as e:
             logger.warning(f"Network error during store of '{key}': {e}")
@@ -108,54 +162,198 @@ class ChordNode(NodeRef):
             logger.error(f"Unexpected error during store of '{key}': {e}")
             return False
 
-    async def _replicate_to_successors(self, key: str, value: Any) -> None:
-        if not self.running: return
+    async def store_owned(self, key: str, value: Any, expires_at: Optional[float] = None, version: Optional[int] = None) -> bool:
+        if not self.data_store.store(key, value, expires_at=expires_at, version=version):
+            return False
+        logger.info(f"Key stored '{key}' locally")
+        if version is not None or expires_at is not None:
+            value = self.data_store.get(key)
+            if value is None:
+                await self.data_store.sync()
+                return True
+            expires_at = self.data_store.get_expiry(key)
+        _, replicated = await asyncio.gather(self.data_store.sync(), self._replicate_to_successors(key, value, expires_at))
+        return replicated
+
+    async def _replicate_to_successors(self, key: str, value: Any, expires_at: Optional[float] = None) -> bool:
+        if not self.running: return False
+        return await self._fan_out_replicas({key: value}, f"'{key}'", {key: expires_at} if expires_at is not None else None,
+                                            self.data_store.versions_for([key]))
+
+    async def _fan_out_replicas(self, items: Dict[str, Any], label: str, expires: Optional[Dict[str, float]] = None,
+                                versions: Optional[Dict[str, int]] = None) -> bool:
         try:
             successors = await self.topology_manager.get_successor_list(self.replication_factor - 1)
-            logger.info(f"Replicating '{key}' to {len(successors)} successors (factor={self.replication_factor})")
-            for i, successor in enumerate(successors):
-                if not self.running: break
-                if successor and successor.id != self.id:
-                    try:
-                        result = await successor.store_replica(key, value)
-                        if result:
-                            logger.info(f"Replicated '{key}' to successor {i + 1}: port {successor.port}")
-                    except (OSError, asyncio.TimeoutError):
-                        logger.debug(f"Failed to replicate '{key}' to successor {successor.port} (unreachable)")
         except Exception as e:
             logger.error(f"Error gathering successors for replication: {e}")
+            return self._required_replica_acks(0) == 0
+        targets = [successor for successor in successors if successor and successor.id != self.id]
+        self.replication_manager.retain(targets)
+        required = self._required_replica_acks(len(targets))
+        logger.debug(f"Replicating {label} to {len(targets)} successors (factor={self.replication_factor}, acks={required})")
+        deadline = asyncio.get_running_loop().time() + ChordSettings.REPLICA_WRITE_TIMEOUT
+        pending = set()
+        for successor in targets:
+            pending.add(await self.replication_manager.enqueue(successor, items, ChordSettings.REPLICA_WRITE_TIMEOUT, expires, versions))
+        acks = 0
+        while acks < required and pending:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED)
+            acks += sum(1 for future in done if future.result())
+        if acks < required:
+            logger.warning(f"Write of {label} acknowledged by {acks}/{required} replicas")
+            return False
+        return True
+
+    def _required_replica_acks(self, available: int) -> int:
+        if self.write_ack_level == 'primary':
+            return 0
+        if self.write_ack_level == 'all':
+            return available
+        return min(max(ChordSettings.WRITE_QUORUM - 1, 0), available)
 
-    async def store_replica(self, key: str, value: Any) -> bool:
+    async def store_replica(self, key: str, value: Any, expires_at: Optional[float] = None, version: Optional[int] = None) -> bool:
         if not self.running: return False
         try:
-            self.data_store.store(key, value)
+            if not self.data_store.store(key, value, expires_at=expires_at, version=version):
+                return False
+            await self.data_store.sync()
             logger.info(f"Replica stored '{key}' locally")
             return True
         except Exception as e:
             logger.error(f"Error storing replica '{key}': {e}")
             return False
 
+    async def store_replicas(self, items: Dict[str, Any], expires: Optional[Dict[str, float]] = None,
+                             versions: Optional[Dict[str, int]] = None) -> bool:
+        if not self.running: return False
+        rejected = self.data_store.receive_keys(items, expires=expires, versions=versions)
+        await self.data_store.sync()
+        return not rejected
+
+    async def _group_by_owner(self, keys: List[str], use_cache: bool = True) -> Tuple[List[str], List[Tuple['RemoteNode', List[str]]], List[str]]:
+        pred = self.topology_manager.predecessor
+        local, groups, unresolved = [], [], []
+        owner = None
+        owner_start = None
+        for key_hash, key in sorted((ChordMath.compute_hash(key), key) for key in keys):
+            if pred and ChordMath.in_interval(pred.id, key_hash, self.id):
+                local.append(key)
+                continue
+            if owner is None or not ChordMath.in_interval(owner_start, key_hash, owner.id):
+                owner = await self.topology_manager.find_successor(key_hash, use_cache=use_cache)
+                if owner is None:
+                    unresolved.append(key)
+                    continue
+                owner_start = (key_hash - 1) % ChordSettings.MODULUS
+                if owner.id != self.id:
+                    groups.append((owner, []))
+            if owner.id == self.id:
+                local.append(key)
+            else:
+                groups[-1][1].append(key)
+        return local, groups, unresolved
+
+    async def multi_store(self, items: Dict[str, Any], use_cache: bool = True, expires: Optional[Dict[str, float]] = None,
+                          versions: Optional[Dict[str, int]] = None) -> Dict[str, bool]:
+        if not self.running: return {key: False for key in items}
+        expires = expires or {}
+        versions = versions or {}
+        if self.read_cache is not None:
+            for key in items:
+                self.read_cache.discard(key)
+        local, groups, unresolved = await self._group_by_owner(list(items), use_cache)
+        results = {key: False for key in unresolved}
+        remote_calls = []
+        for owner, keys in groups:
+            for i in range(0, len(keys), ChordSettings.MULTI_BATCH_SIZE):
+                chunk = keys[i:i + ChordSettings.MULTI_BATCH_SIZE]
+                remote_calls.append((owner, chunk, owner.multi_store({key: items[key] for key in chunk}, self._subset(expires, chunk),
+                                                                     self._subset(versions, chunk))))
+        if local:
+            rejected = set(self.data_store.receive_keys({key: items[key] for key in local}, expires=expires, versions=versions))
+            results.update((key, False) for key in rejected)
+            local = [key for key in local if key not in rejected]
+        if local:
+            batch = {key: items[key] for key in local}
+            if versions or expires:
+                current = {key: self.data_store.get(key) for key in local}
+                batch = {key: value for key, value in current.items() if value is not None}
+            remote_calls.append((None, local, self._sync_and_replicate(batch, self.data_store.expirations_for(list(batch)))))
+        replies = await asyncio.gather(*(call for _, _, call in remote_calls), return_exceptions=True)
+        for (owner, chunk, _), reply in zip(remote_calls, replies):
+            if owner is None:
+                results.update((key, reply is True) for key in chunk)
+                continue
+            if isinstance(reply, BaseException) or reply is None:
+                logger.warning(f"Multi store of {len(chunk)} keys to node {owner.port} failed")
+                reply = {}
+            results.update((key, bool(reply.get(key))) for key in chunk)
+        logger.info(f"Multi store of {len(items)} keys: {sum(results.values())} stored, {len(local)} locally")
+        return results
+
+    @staticmethod
+    def _subset(metadata: Dict[str, Any], keys: List[str]) -> Dict[str, Any]:
+        return {key: metadata[key] for key in keys if key in metadata}
+
+    async def _sync_and_replicate(self, items: Dict[str, Any], expires: Optional[Dict[str, float]] = None) -> bool:
+        _, replicated = await asyncio.gather(self.data_store.sync(), self._replicate_batch_to_successors(items, expires))
+        return replicated
+
+    async def _replicate_batch_to_successors(self, items: Dict[str, Any], expires: Optional[Dict[str, float]] = None) -> bool:
+        if not self.running: return False
+        if not items: return True
+        return await self._fan_out_replicas(items, f"{len(items)} keys", expires, self.data_store.versions_for(list(items)))
+
+    async def multi_get(self, keys: List[str], use_cache: bool = True) -> Dict[str, Any]:
+        if not self.running: return {}
+        values: Dict[str, Any] = {}
+        missing = []
+        for key in keys:
+            value = self.data_store.get(key)
+            if value is not None:
+                values[key] = value
+            else:
+                missing.append(key)
+        _, groups, unreachable = await self._group_by_owner(missing, use_cache)
+        remote_calls = []
+        for owner, group in groups:
+            for i in range(0, len(group), ChordSettings.MULTI_BATCH_SIZE):
+                chunk = group[i:i + ChordSettings.MULTI_BATCH_SIZE]
+                remote_calls.append((chunk, owner.multi_get(chunk)))
+        replies = await asyncio.gather(*(call for _, call in remote_calls), return_exceptions=True)
+        for (chunk, _), reply in zip(remote_calls, replies):
+            if isinstance(reply, BaseException) or reply is None:
+                unreachable.extend(chunk)
+                continue
+            values.update((key, value) for key, value in reply.items() if value is not None)
+        if unreachable:
+            recovered = await asyncio.gather(*(self._get_from_replicas(key) for key in unreachable))
+            values.update((key, value) for key, value in zip(unreachable, recovered) if value is not None)
+        return {key: values.get(key) for key in keys}
+
     async def get(self, key: str) -> Optional[Any]:
         if not self.running: return None
         try:
             local_value = self.data_store.get(key)
             if local_value is not None:
                 return local_value
+            if self.read_cache is not None:
+                cached = self.read_cache.get(key)
+                if cached is not None:
+                    return cached
 
             key_hash = ChordMath.compute_hash(key)
+            responsible_node = None
             try:
                 responsible_node = await asyncio.wait_for(self.topology_manager.find_successor(key_hash),timeout=NetworkSettings.TIMEOUT)
-
-                if responsible_node and responsible_node.id == self.id:
-                    return None
-
-                if responsible_node:
-                    value = await asyncio.wait_for(responsible_node.get_key(key), timeout=NetworkSettings.TIMEOUT)
-                    if value is not None:
-                        return value
             except (asyncio.TimeoutError, OSError):
                 pass
-            return await self._get_from_replicas(key)
+            if responsible_node and responsible_node.id == self.id:
+                return None
+            return await self._hedged_get(key, self._read_candidates(key_hash, responsible_node), responsible_node)
 
         except Exception as e:
             logger.error(f"Error during get of '{key}': {e}")
@@ -164,33 +362,131 @@ class ChordNode(NodeRef):
     async def _get_from_replicas(self, key: str) -> Optional[Any]:
         if not self.running: return None
         try:
-            potential_nodes = await self.topology_manager.get_successor_list(self.replication_factor)
-
-            if len(potential_nodes) < self.replication_factor:
-                for finger in self.finger_table.fingers:
-                    if finger and finger.id != self.id:
-                        potential_nodes.append(finger)
-
-            unique_nodes = []
-            seen = {self.id}
-            for n in potential_nodes:
-                if n and n.id not in seen:
-                    unique_nodes.append(n)
-                    seen.add(n.id)
-
-            for node in unique_nodes:
-                if not self.running: return None
-                try:
-                    value = await asyncio.wait_for(node.get_key(key), timeout=NetworkSettings.TIMEOUT)
-                    if value is not None:
-                        logger.info(f"Key '{key}' recovered from replica/finger at port {node.port}")
-                        return value
-                except (OSError, asyncio.TimeoutError):
-                    continue
+            return await self._hedged_get(key, self._read_candidates(ChordMath.compute_hash(key), None), None)
         except Exception as e:
             logger.debug(f"Error in replica lookup logic: {e}")
         return None
 
+    def _read_candidates(self, key_hash: int, owner: Optional['RemoteNode']) -> List['RemoteNode']:
+        known = {}
+        for node in [self.topology_manager.successor, self.topology_manager.predecessor, *self.topology_manager.successor_list, *self.finger_table.distinct_nodes()]:
+            if node and node.id != self.id:
+                known.setdefault(node.id, node)
+        ordered = sorted(known.values(), key=lambda node: (node.id - key_hash) % ChordSettings.MODULUS)
+        if owner is not None:
+            ordered = [owner] + [node for node in ordered if node.id != owner.id]
+        liveness = LivenessTracker.shared()
+        healthy = [node for node in ordered if not liveness.is_suspected(node.ip, node.port)]
+        suspected = [node for node in ordered if liveness.is_suspected(node.ip, node.port)]
+        return healthy + suspected
+
+    async def _hedged_get(self, key: str, candidates: List['RemoteNode'], owner: Optional['RemoteNode']) -> Optional[Any]:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + NetworkSettings.TIMEOUT
+        delay = self._hedge_delay()
+        remaining = iter(candidates)
+        pending = {}
+        owner_missed = False
+        self.read_stats['reads'] += 1
+
+        def launch() -> bool:
+            node = next(remaining, None)
+            if node is None:
+                return False
+            routed = owner is not None and node.id == owner.id
+            pending[asyncio.ensure_future(self._timed_get(node, key, routed))] = node
+            return True
+
+        launch()
+        try:
+            while pending and self.running:
+                timeout = min(delay, deadline - loop.time())
+                if timeout <= 0:
+                    break
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if launch():
+                        self.read_stats['hedged'] += 1
+                    continue
+                for task in done:
+                    node = pending.pop(task)
+                    value = task.result()
+                    if value is not None:
+                        if owner is None or node.id != owner.id:
+                            self.read_stats['replica_hits'] += 1
+                            logger.info(f"Key '{key}' recovered from replica/finger at port {node.port}")
+                            if owner_missed:
+                                self.topology_manager.location_cache.invalidate(owner.id)
+                        return value
+                    if owner is not None and node.id == owner.id:
+                        owner_missed = True
+                    launch()
+        finally:
+            for task in pending:
+                task.cancel()
+        return None
+
+    async def _timed_get(self, node: 'RemoteNode', key: str, routed: bool) -> Optional[Any]:
+        started = time.monotonic()
+        if routed and self.read_cache is not None:
+            value, version = await node.get_key_entry(key, reader=self)
+            if value is not None and version is not None:
+                self.read_cache.put(key, value, version)
+        else:
+            value = await node.get_key(key, local_only=not routed)
+        if value is not None:
+            self._read_latencies.append(time.monotonic() - started)
+        return value
+
+    def serve_read(self, key: str, reader: Peer) -> Tuple[Optional[Any], Optional[int]]:
+        value = self.data_store.get(key)
+        if value is None:
+            return None, None
+        self.read_subscriptions.track(key, reader)
+        return value, self.data_store.get_version(key)
+
+    def invalidate_cached(self, versions: Dict[str, int]) -> None:
+        if self.read_cache is None:
+            return
+        for key, version in versions.items():
+            self.read_cache.invalidate(key, version)
+
+    def _note_local_write(self, key_hash: int, key: str) -> None:
+        if key not in self.read_subscriptions:
+            return
+        readers = self.read_subscriptions.take(key)
+        if not readers:
+            return
+        version = self.data_store.get_version(key) or self.data_store.next_version()
+        for reader in readers:
+            self._pending_invalidations.setdefault(reader, {})[key] = version
+        if self.running and (self._invalidation_task is None or self._invalidation_task.done()):
+            self._invalidation_task = asyncio.ensure_future(self._flush_invalidations())
+
+    async def _flush_invalidations(self) -> None:
+        await asyncio.sleep(0)
+        while self._pending_invalidations and self.running:
+            pending, self._pending_invalidations = self._pending_invalidations, {}
+            readers = [RemoteNode.shared(node_id, ip, port, self.ip, self.port) for node_id, ip, port in pending]
+            results = await asyncio.gather(*(reader.invalidate_keys(versions) for reader, versions in zip(readers, pending.values())),
+                                           return_exceptions=True)
+            for reader, result in zip(readers, results):
+                if result is not True:
+                    logger.debug(f"Cache invalidation to {reader.port} failed, its entries will expire by TTL")
+
+    def _owned_range(self) -> Optional[Tuple[int, int]]:
+        pred = self.topology_manager.predecessor
+        if pred is None or pred.id == self.id:
+            return None
+        return pred.id, self.id
+
+    def _hedge_delay(self) -> float:
+        if ChordSettings.HEDGE_PERCENTILE is None or len(self._read_latencies) < ChordSettings.HEDGE_MIN_SAMPLES:
+            return ChordSettings.HEDGE_DELAY
+        ordered = sorted(self._read_latencies)
+        index = min(int(len(ordered) * ChordSettings.HEDGE_PERCENTILE / 100), len(ordered) - 1)
+        return min(max(ordered[index], ChordSettings.HEDGE_MIN_DELAY), ChordSettings.HEDGE_MAX_DELAY)
+
     def get_status(self) -> dict:
         successor = self.topology_manager.successor
         pred = self.topology_manager.predecessor
@@ -201,5 +497,19 @@ class ChordNode(NodeRef):
             'successor': successor.id if successor else None,
             'predecessor': pred.id if pred else None,
             'keys_count': len(self.data_store.data),
+            'lookup_mode': self.topology_manager.lookup_mode,
+            'write_ack_level': self.write_ack_level,
+            'replication': self.replication_manager.stats(),
+            'read_stats': dict(self.read_stats),
+            'hedge_delay': round(self._hedge_delay(), 4),
+            'location_cache': self.topology_manager.location_cache.get_stats(),
+            'read_cache': self.read_cache.get_stats() if self.read_cache is not None else None,
+            'storage': self.data_store.backend.get_stats(),
+            'memory': self.data_store.get_memory_stats(),
+            'expiry': self.data_store.get_expiry_stats(),
+            'versions': self.data_store.get_version_stats(),
+            'transfer': self.data_transfer_manager.get_stats(),
+            'connections': ConnectionPool.for_running_loop().stats(),
+            'lookup_stats': dict(self.topology_manager.lookup_stats),
             'keys': list(self.data_store.data.keys())
         }
\ No newline at end of file
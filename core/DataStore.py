@@ -1,60 +1,329 @@
-from typing import Dict, List, Any
+import asyncio
+import heapq
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Any, MutableMapping, Optional, Tuple
+from network.Codec import get_codec
+from storage.MappedSnapshot import SnapshotOverlay
+from storage.StorageBackend import StorageBackend, MemoryBackend, TOMBSTONE
 from utils.ChordMath import ChordMath
+from utils.HybridClock import HybridClock
+from config.Settings import ChordSettings, StorageSettings
 from config.LoggingConfig import get_logger
+from .HashIndex import HashIndex, HASH_SIZE
 
 logger = get_logger("DataStore")
 
+MEMORY_POLICIES = ('reject', 'evict_replicas', 'spill')
+DICT_SLOT_SIZE = 48
+ENTRY_OVERHEAD = 2 * DICT_SLOT_SIZE + sys.getsizeof(2 ** 60) + HASH_SIZE + 16
+
+_codec = get_codec('binary')
+_MISSING = object()
+
 
 class DataStore:
 
-    def __init__(self):
-        self.data: Dict[str, Any] = {}
-        self.key_hashes: Dict[str, int] = {}
+    def __init__(self, backend: Optional[StorageBackend] = None, memory_budget: Optional[int] = None,
+                 memory_policy: Optional[str] = None, compact: Optional[bool] = None):
+        self.hash_index = HashIndex()
+        self.versions: Dict[str, int] = {}
+        self.clock = HybridClock()
+        self.version_stats = {'stale_writes': 0}
+        self.write_observers: List[Callable[[int, str], None]] = []
+        self.memory_budget = StorageSettings.MEMORY_BUDGET if memory_budget is None else memory_budget
+        self.memory_policy = memory_policy or StorageSettings.MEMORY_POLICY
+        if self.memory_policy not in MEMORY_POLICIES:
+            raise ValueError(f"Unknown memory policy: {self.memory_policy}")
+        self.compact = StorageSettings.COMPACT_VALUES if compact is None else compact
+        self.memory_bytes = 0
+        self.memory_stats = {'rejected': 0, 'evicted': 0, 'spills': 0}
+        self.owned_range: Optional[Callable[[], Optional[Tuple[int, int]]]] = None
+        self.expirations: Dict[str, float] = {}
+        self._expiry_heap: List[Tuple[float, str]] = []
+        self.expiry_stats = {'expired': 0, 'expired_on_read': 0}
+        self._spill_task: Optional[asyncio.Future] = None
+        self.backend = backend or MemoryBackend()
+        if self.memory_policy == 'spill' and not self.backend.durable:
+            raise ValueError(f"Memory policy 'spill' needs a durable storage backend, not '{self.backend.name}'")
+        recovered = self.backend.recover()
+        self.data: MutableMapping[str, Any] = SnapshotOverlay(recovered.base, raw=self.compact) if self.backend.durable else {}
+        self._memory: Dict[str, Any] = self.data.overlay if isinstance(self.data, SnapshotOverlay) else self.data
+        if recovered.base is not None:
+            self.clock.observe(recovered.base.max_version)
+        for key, value in recovered.records.items():
+            if value is TOMBSTONE:
+                self.data.pop(key, None)
+            else:
+                self._load(key, value, recovered.versions.get(key, 0))
+        for key, expires_at in recovered.expirations.items():
+            if key in self.data:
+                self._set_expiry(key, expires_at)
 
-    def store(self, key: str, value: Any) -> bool:
+    def _load(self, key: str, value: Any, version: int) -> None:
+        key = sys.intern(key)
+        stored = self._encode(value)
+        previous = self._memory.get(key, _MISSING)
+        if previous is _MISSING:
+            self.hash_index.add(ChordMath.compute_hash(key), key)
+        self.data[key] = stored
+        self.memory_bytes += self._entry_size(key, stored) - self._entry_size(key, previous)
+        self.versions[key] = version
+        self.clock.observe(version)
+
+    def store(self, key: str, value: Any, force: bool = False, expires_at: Optional[float] = None, version: Optional[int] = None) -> bool:
+        if version is not None:
+            self.clock.observe(version)
+            if not self._supersedes(key, value, version):
+                self.version_stats['stale_writes'] += 1
+                logger.debug(f"Ignored stale write of '{key}' at version {version}")
+                return True
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return True
+        key = sys.intern(key)
+        stored = self._encode(value)
+        previous = self._memory.get(key, _MISSING)
+        delta = self._entry_size(key, stored) - self._entry_size(key, previous)
+        if not force and delta > 0 and not self._reserve(delta, key):
+            self.memory_stats['rejected'] += 1
+            logger.warning(f"Rejected key '{key}': memory budget of {self.memory_budget} bytes exhausted ({self.memory_bytes} used)")
+            return False
         key_hash = ChordMath.compute_hash(key)
-        self.data[key] = value
-        self.key_hashes[key] = key_hash
+        if previous is _MISSING:
+            self.hash_index.add(key_hash, key)
+        self.data[key] = stored
+        self.memory_bytes += delta
+        self.versions[key] = version if version is not None else self.clock.now()
+        self._set_expiry(key, expires_at)
+        self.backend.append_put(key, value, expires_at, self.versions[key])
+        self._notify(key_hash, key)
         logger.debug(f"Memorized key '{key}' with hash {key_hash}")
         return True
 
-    def get(self, key: str) -> Any:
-        return self.data.get(key)
+    def get(self, key: str, expire: bool = True) -> Any:
+        expires_at = self.expirations.get(key)
+        if expires_at is not None and expires_at <= time.time():
+            if not expire:
+                return None
+            self._expire(key)
+            self.expiry_stats['expired_on_read'] += 1
+            return None
+        return self._decode(self.data.get(key))
+
+    def _supersedes(self, key: str, value: Any, version: int) -> bool:
+        current = self.get_version(key)
+        if current is None or version > current:
+            return True
+        if version < current:
+            return False
+        return _codec.encode(value) > _codec.encode(self.get(key, expire=False))
+
+    def outdated_keys(self, versions: Dict[str, int]) -> List[str]:
+        outdated = []
+        for key, version in versions.items():
+            current = self.get_version(key)
+            if current is None or current < version:
+                outdated.append(key)
+        return outdated
+
+    def versions_for(self, keys: List[str]) -> Dict[str, int]:
+        return {key: self.get_version(key) for key in keys}
+
+    def get_version_stats(self) -> Dict[str, Any]:
+        return dict(self.version_stats, clock=self.clock.last)
+
+    def get_expiry(self, key: str) -> Optional[float]:
+        return self.expirations.get(key)
+
+    def expirations_for(self, keys: List[str]) -> Dict[str, float]:
+        return {key: self.expirations[key] for key in keys if key in self.expirations}
+
+    def _set_expiry(self, key: str, expires_at: Optional[float]) -> None:
+        if expires_at is None:
+            self.expirations.pop(key, None)
+            return
+        self.expirations[key] = expires_at
+        heapq.heappush(self._expiry_heap, (expires_at, key))
+        if len(self._expiry_heap) > 2 * len(self.expirations) + StorageSettings.EXPIRY_BATCH_SIZE:
+            self._expiry_heap = [(deadline, pending) for pending, deadline in self.expirations.items()]
+            heapq.heapify(self._expiry_heap)
+
+    def _expire(self, key: str) -> None:
+        self.delete(key)
+        self.expiry_stats['expired'] += 1
+        logger.debug(f"Key '{key}' expired")
+
+    def expire(self, limit: int = StorageSettings.EXPIRY_BATCH_SIZE) -> int:
+        now = time.time()
+        heap = self._expiry_heap
+        expired = 0
+        for _ in range(limit):
+            if not heap or heap[0][0] > now:
+                break
+            expires_at, key = heapq.heappop(heap)
+            if self.expirations.get(key) == expires_at:
+                self._expire(key)
+                expired += 1
+        return expired
+
+    def expiry_due(self) -> bool:
+        return bool(self._expiry_heap) and self._expiry_heap[0][0] <= time.time()
+
+    def get_expiry_stats(self) -> Dict[str, Any]:
+        return dict(self.expiry_stats, with_ttl=len(self.expirations))
+
+    def _encode(self, value: Any) -> Any:
+        return _codec.encode(value) if self.compact else value
+
+    def _decode(self, stored: Any) -> Any:
+        return _codec.decode(stored) if self.compact and stored is not None else stored
+
+    @staticmethod
+    def _entry_size(key: str, stored: Any) -> int:
+        if stored is _MISSING:
+            return 0
+        return sys.getsizeof(key) + sys.getsizeof(stored) + ENTRY_OVERHEAD
+
+    def _reserve(self, needed: int, key: str) -> bool:
+        if self.memory_budget is None or self.memory_bytes + needed <= self.memory_budget:
+            return True
+        if self.memory_policy == 'evict_replicas':
+            self._evict_replicas(self.memory_bytes + needed - self.memory_budget, key)
+            return self.memory_bytes + needed <= self.memory_budget
+        if self.memory_policy == 'spill':
+            if self._spill_task is None or self._spill_task.done():
+                self._spill_task = asyncio.ensure_future(self._spill())
+            return True
+        return False
+
+    def _evict_replicas(self, needed: int, keep: str) -> None:
+        owned = self.owned_range() if self.owned_range is not None else None
+        if owned is None:
+            return
+        start, end = owned
+        freed = 0
+        victims = []
+        for _, key in self.iter_range(end, start, resident_only=True):
+            if key == keep:
+                continue
+            victims.append(key)
+            freed += self._entry_size(key, self._memory[key])
+            if freed >= needed:
+                break
+        for key in victims:
+            self.delete(key)
+        self.memory_stats['evicted'] += len(victims)
+        if victims:
+            logger.info(f"Evicted {len(victims)} replica keys to free {freed} bytes")
+
+    async def _spill(self) -> None:
+        self.memory_stats['spills'] += 1
+        used = self.memory_bytes
+        await self.checkpoint(force=True)
+        logger.info(f"Spilled data to disk: memory use went from {used} to {self.memory_bytes} bytes")
+
+    def get_memory_stats(self) -> Dict[str, Any]:
+        return dict(self.memory_stats, budget=self.memory_budget, used=self.memory_bytes, policy=self.memory_policy,
+                    compact=self.compact, resident_keys=len(self._memory), index_bytes=self.hash_index.nbytes)
+
+    def get_version(self, key: str) -> Optional[int]:
+        version = self.versions.get(key)
+        if version is None and isinstance(self.data, SnapshotOverlay) and key in self.data:
+            return self.data.base.version(key) or 0
+        return version
+
+    def next_version(self) -> int:
+        return self.clock.now()
 
     def delete(self, key: str) -> Any:
-        self.key_hashes.pop(key, None)
-        value = self.data.pop(key, None)
+        self._unindex(key)
+        value = self._decode(self.data.pop(key, None))
         if value is not None:
             logger.debug(f"Removed key '{key}'")
         return value
 
     def get_keys_in_range(self, start: int, end: int) -> List[str]:
-        keys = []
-        for orig_key, key_hash in self.key_hashes.items():
-            if ChordMath.in_interval(start, key_hash, end):
-                keys.append(orig_key)
-        return keys
+        return [key for _, key in self.iter_range(start, end)]
+
+    def iter_range(self, start: int, end: int, resident_only: bool = False) -> Iterator[Tuple[int, str]]:
+        if start == end:
+            yield from self._irange(start - 1, start, resident_only)
+        elif start < end:
+            yield from self._irange(start, end, resident_only)
+        else:
+            yield from self._irange(start, ChordSettings.MODULUS - 1, resident_only)
+            yield from self._irange(-1, end, resident_only)
+
+    def _irange(self, low: int, high: int, resident_only: bool = False) -> Iterator[Tuple[int, str]]:
+        if not resident_only and isinstance(self.data, SnapshotOverlay) and self.data.base is not None:
+            return heapq.merge(self.hash_index.irange(low, high), self.data.base_irange(low, high))
+        return self.hash_index.irange(low, high)
+
+    def _unindex(self, key: str) -> None:
+        if key not in self.data:
+            return
+        key_hash = ChordMath.compute_hash(key)
+        self.versions.pop(key, None)
+        self.expirations.pop(key, None)
+        self.backend.append_delete(key)
+        if key in self._memory:
+            self.hash_index.discard(key_hash, key)
+            self.memory_bytes -= self._entry_size(key, self._memory[key])
+        self._notify(key_hash, key)
+
+    def _notify(self, key_hash: int, key: str) -> None:
+        for observer in self.write_observers:
+            observer(key_hash, key)
 
     def transfer_keys(self, keys: List[str]) -> Dict[str, Any]:
         transferred = {}
         for key in keys:
             if key in self.data:
-                transferred[key] = self.data.pop(key)
-                self.key_hashes.pop(key, None)
+                self._unindex(key)
+                transferred[key] = self._decode(self.data.pop(key))
         if transferred:
             logger.info(f"Transferred {len(transferred)} keys")
         return transferred
 
-    def receive_keys(self, key_value_dict: Dict[str, Any]) -> None:
-        for key, value in key_value_dict.items():
-            self.store(key, value)
+    def receive_keys(self, key_value_dict: Dict[str, Any], force: bool = False, expires: Optional[Dict[str, float]] = None,
+                     versions: Optional[Dict[str, int]] = None) -> List[str]:
+        expires = expires or {}
+        versions = versions or {}
+        rejected = [key for key, value in key_value_dict.items() if not self.store(key, value, force, expires.get(key), versions.get(key))]
         if key_value_dict:
-            logger.info(f"Received {len(key_value_dict)} keys")
+            logger.info(f"Received {len(key_value_dict) - len(rejected)} keys" + (f", rejected {len(rejected)}" if rejected else ""))
+        return rejected
 
     def get_all_data(self) -> Dict[str, Any]:
-        return self.data.copy()
+        return {key: self._decode(stored) for key, stored in self.data.items()}
+
+    async def sync(self) -> None:
+        await self.backend.sync()
+
+    async def checkpoint(self, force: bool = False) -> bool:
+        if not isinstance(self.data, SnapshotOverlay):
+            return False
+        result = await self.backend.checkpoint(self.data, force, self.expirations, self.versions)
+        if result is None:
+            return False
+        _, overlay, _ = result
+        for key in self.data.rebase(*result):
+            self.hash_index.discard(ChordMath.compute_hash(key), key)
+            self.versions.pop(key, None)
+            self.memory_bytes -= self._entry_size(key, overlay[key])
+        return True
+
+    def close(self) -> None:
+        self.backend.close()
 
     def clear(self) -> None:
-        self.data.clear()
-        self.key_hashes.clear()
+        for key in list(self.data):
+            self.backend.append_delete(key)
+            del self.data[key]
+        self.versions.clear()
+        self.expirations.clear()
+        self._expiry_heap.clear()
+        self.hash_index.clear()
+        self.memory_bytes = 0
         logger.info("Storage cleared out")
@@ -1,5 +1,11 @@
-from typing import List, Dict, Any, TYPE_CHECKING
+import asyncio
+import secrets
+import time
+from collections import OrderedDict, deque
+from typing import Deque, List, Dict, Any, Optional, Set, Tuple, TYPE_CHECKING
+from utils.ChordMath import ChordMath
 from config.LoggingConfig import get_logger
+from config.Settings import ChordSettings
 
 if TYPE_CHECKING:
     from .DataStore import DataStore
@@ -8,11 +14,50 @@ if TYPE_CHECKING:
 logger = get_logger("DataTransferManager")
 
 
+def approximate_size(value: Any) -> int:
+    if isinstance(value, (str, bytes, bytearray)):
+        return len(value)
+    if isinstance(value, (int, float, bool)) or value is None:
+        return 8
+    return len(repr(value))
+
+
+class OutboundHandoff:
+
+    def __init__(self, transfer_id: str, start: int, end: int):
+        self.transfer_id = transfer_id
+        self.start = start
+        self.end = end
+        self.acked: Optional[int] = None
+        self.dirty: Set[str] = set()
+        self.last_activity = time.monotonic()
+
+
+class InboundHandoff:
+
+    def __init__(self, transfer_id: str, source: 'RemoteNode', start: int, end: int):
+        self.transfer_id = transfer_id
+        self.source = source
+        self.start = start
+        self.end = end
+        self.cursor: Optional[int] = None
+        self.received = 0
+        self.done = False
+        self.resumes = 0
+        self.digest = ChordSettings.TRANSFER_DIGEST_FIRST
+
+
 class DataTransferManager:
 
     def __init__(self, data_store: 'DataStore', node_id: int):
         self.data_store = data_store
         self.node_id = node_id
+        self._outbound: Dict[str, OutboundHandoff] = {}
+        self._inbound: Dict[Tuple[str, int, int, int], InboundHandoff] = {}
+        self._commits: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.stats = {'digest_batches': 0, 'offered_keys': 0, 'fetched_keys': 0, 'skipped_keys': 0, 'abandoned_handoffs': 0}
+        self.abandoned: Deque[Dict[str, Any]] = deque(maxlen=ChordSettings.TRANSFER_ABANDONED_HISTORY)
+        self.data_store.write_observers.append(self._note_write)
 
     async def acquire_keys_from_successor(self, successor_node: 'RemoteNode') -> int:
         try:
@@ -20,22 +65,212 @@ class DataTransferManager:
             start_id = predecessor.id if predecessor else successor_node.id
             end_id = self.node_id
             logger.info(f"Retrieving keys from a range ({start_id % 1000 if start_id is not None else None}, {end_id % 1000 if end_id is not None else None}]")
-            keys_to_transfer = await successor_node.get_keys_in_range(start_id, end_id)
-            if keys_to_transfer:
-                data = await successor_node.transfer_keys(keys_to_transfer)
-                self.receive_keys(data)
-                logger.info(f"Retrieved {len(data)} keys from successor")
-                return len(data)
-            return 0
+            return await self.stream_range_from(successor_node, start_id, end_id)
         except Exception as e:
             logger.error(f"Error while retrieving keys from a range: {e}")
             return 0
 
+    async def stream_range_from(self, source: 'RemoteNode', start: int, end: int) -> int:
+        checkpoint_key = (source.ip, source.port, start, end)
+        handoff = self._inbound.get(checkpoint_key)
+        if handoff is None:
+            handoff = self._inbound[checkpoint_key] = InboundHandoff(secrets.token_hex(8), source, start, end)
+        elif handoff.cursor is not None:
+            logger.info(f"Resuming handoff {handoff.transfer_id} from {source.id % 1000} after {handoff.received} keys")
+        batches = 0
+        failures = 0
+        while not handoff.done:
+            batch = await self._next_batch(source, handoff, start, end)
+            if batch is None:
+                failures += 1
+                if failures > ChordSettings.TRANSFER_MAX_RETRIES:
+                    logger.warning(f"Handoff {handoff.transfer_id} from {source.id % 1000} interrupted after {handoff.received} keys, will resume later")
+                    return handoff.received
+                await asyncio.sleep(ChordSettings.TRANSFER_RETRY_DELAY * failures)
+                continue
+            if batch.get('error') == 'unknown_command':
+                del self._inbound[checkpoint_key]
+                return await self._acquire_by_key_list(source, start, end)
+            failures = 0
+            data = batch.get('data', {})
+            rejected = self.receive_keys(data, expires=batch.get('expires'), versions=batch.get('versions'))
+            if rejected:
+                logger.warning(f"Handoff {handoff.transfer_id} from {source.id % 1000} paused: {len(rejected)} keys rejected by the memory budget")
+                handoff.cursor = None
+                handoff.received = 0
+                await self.data_store.sync()
+                return 0
+            handoff.received += len(data)
+            handoff.cursor = batch.get('cursor')
+            handoff.done = batch.get('done', True)
+            batches += 1
+        await self.data_store.sync()
+        committed = await self._commit(source, handoff, start, end)
+        if committed:
+            del self._inbound[checkpoint_key]
+            logger.info(f"Retrieved {handoff.received} keys from {source.id % 1000} in {batches} batches")
+        return handoff.received
+
+    async def _next_batch(self, source: 'RemoteNode', handoff: InboundHandoff, start: int, end: int) -> Optional[Dict[str, Any]]:
+        batch = await source.transfer_range(handoff.transfer_id, start, end, handoff.cursor,
+                                            ChordSettings.TRANSFER_BATCH_SIZE, ChordSettings.TRANSFER_BATCH_BYTES, handoff.digest)
+        if batch is None or 'versions' not in batch:
+            return batch
+        offered = batch['versions']
+        wanted = self.data_store.outdated_keys(offered)
+        if ChordSettings.TRANSFER_DIGEST_FIRST:
+            handoff.digest = len(wanted) < len(offered)
+        if 'data' in batch:
+            return batch
+        self.stats['digest_batches'] += 1
+        self.stats['offered_keys'] += len(offered)
+        self.stats['skipped_keys'] += len(offered) - len(wanted)
+        fetched = {'data': {}}
+        if wanted:
+            fetched = await source.fetch_keys(wanted)
+            if fetched is None:
+                return None
+            self.stats['fetched_keys'] += len(fetched.get('data', {}))
+        return dict(fetched, cursor=batch.get('cursor'), done=batch.get('done', True))
+
+    def has_pending(self) -> bool:
+        return bool(self._inbound)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, pending_handoffs=len(self._inbound), abandoned=list(self.abandoned))
+
+    async def resume_pending(self) -> int:
+        resumed = 0
+        for checkpoint_key, handoff in list(self._inbound.items()):
+            handoff.resumes += 1
+            if handoff.resumes > ChordSettings.TRANSFER_MAX_RETRIES:
+                logger.warning(f"Giving up on handoff {handoff.transfer_id} from {handoff.source.id % 1000} after {handoff.received} keys")
+                del self._inbound[checkpoint_key]
+                self.stats['abandoned_handoffs'] += 1
+                self.abandoned.append({'transfer_id': handoff.transfer_id, 'source': f"{handoff.source.ip}:{handoff.source.port}",
+                                       'start': handoff.start, 'end': handoff.end, 'received': handoff.received,
+                                       'abandoned_at': time.time()})
+                continue
+            resumed += await self.stream_range_from(handoff.source, handoff.start, handoff.end)
+        return resumed
+
+    async def _commit(self, source: 'RemoteNode', handoff: InboundHandoff, start: int, end: int) -> bool:
+        for attempt in range(ChordSettings.TRANSFER_MAX_RETRIES + 1):
+            result = await source.commit_transfer(handoff.transfer_id, start, end, handoff.cursor)
+            if result is not None:
+                break
+            await asyncio.sleep(ChordSettings.TRANSFER_RETRY_DELAY * (attempt + 1))
+        else:
+            logger.warning(f"Commit of handoff {handoff.transfer_id} not acknowledged, will retry on resume")
+            return False
+        if result.get('error') == 'unknown_transfer':
+            logger.warning(f"Source forgot handoff {handoff.transfer_id}, restarting it from scratch")
+            handoff.transfer_id = secrets.token_hex(8)
+            handoff.cursor = None
+            handoff.done = False
+            return False
+        modified = result.get('modified', {})
+        self.receive_keys(modified, force=True, expires=result.get('expires'), versions=result.get('versions'))
+        for key in result.get('deleted', []):
+            self.data_store.delete(key)
+        await self.data_store.sync()
+        if modified or result.get('deleted'):
+            logger.info(f"Handoff {handoff.transfer_id}: {len(modified)} keys modified and {len(result.get('deleted', []))} deleted during copy")
+        return True
+
+    async def _acquire_by_key_list(self, source: 'RemoteNode', start: int, end: int) -> int:
+        keys_to_transfer = await source.get_keys_in_range(start, end)
+        if not keys_to_transfer:
+            return 0
+        result = await source.transfer_keys(keys_to_transfer)
+        data = result.get('data', {})
+        self.receive_keys(data, force=True, expires=result.get('expires'), versions=result.get('versions'))
+        await self.data_store.sync()
+        return len(data)
+
+    def transfer_range_local(self, transfer_id: str, start: int, end: int, after: Optional[int], limit: int, max_bytes: int,
+                             digest: bool = False) -> Dict[str, Any]:
+        self._expire_handoffs()
+        handoff = self._outbound.get(transfer_id)
+        if handoff is None:
+            handoff = self._outbound[transfer_id] = OutboundHandoff(transfer_id, start, end)
+        handoff.acked = after
+        handoff.last_activity = time.monotonic()
+        if after is not None and after == end:
+            return {'data': {}, 'cursor': after, 'done': True}
+        data = {}
+        size = 0
+        cursor = after
+        done = True
+        for key_hash, key in self.data_store.iter_range(start if after is None else after, end):
+            if len(data) >= limit or (data and size >= max_bytes):
+                done = False
+                break
+            cursor = key_hash
+            value = self.data_store.get(key, expire=False)
+            if value is None:
+                continue
+            data[key] = value
+            size += len(key) + approximate_size(value)
+        versions = self.data_store.versions_for(list(data))
+        if digest:
+            return {'versions': versions, 'cursor': cursor, 'done': done}
+        return {'data': data, 'expires': self.data_store.expirations_for(list(data)), 'versions': versions, 'cursor': cursor, 'done': done}
+
+    def fetch_keys_local(self, keys: List[str]) -> Dict[str, Any]:
+        data = {}
+        for key in keys:
+            value = self.data_store.get(key)
+            if value is not None:
+                data[key] = value
+        return {'data': data, 'expires': self.data_store.expirations_for(list(data)), 'versions': self.data_store.versions_for(list(data))}
+
+    def commit_transfer_local(self, transfer_id: str, start: int, end: int, upto: Optional[int]) -> Dict[str, Any]:
+        if transfer_id in self._commits:
+            return self._commits[transfer_id]
+        handoff = self._outbound.pop(transfer_id, None)
+        if handoff is None:
+            return {'error': 'unknown_transfer'}
+        modified = {}
+        deleted = []
+        for key in handoff.dirty:
+            value = self.data_store.get(key)
+            if value is None:
+                deleted.append(key)
+            else:
+                modified[key] = value
+        if upto is not None:
+            keys = [key for _, key in self.data_store.iter_range(start, upto)]
+            self.data_store.transfer_keys(keys)
+        expires = self.data_store.expirations_for(list(modified))
+        versions = self.data_store.versions_for(list(modified))
+        self.data_store.transfer_keys(list(modified))
+        result = {'status': 'ok', 'modified': modified, 'expires': expires, 'versions': versions, 'deleted': deleted}
+        self._commits[transfer_id] = result
+        while len(self._commits) > ChordSettings.TRANSFER_COMMIT_HISTORY:
+            self._commits.popitem(last=False)
+        logger.info(f"Committed handoff {transfer_id}")
+        return result
+
+    def _note_write(self, key_hash: int, key: str) -> None:
+        for handoff in self._outbound.values():
+            if ChordMath.in_interval(handoff.start, key_hash, handoff.end):
+                handoff.dirty.add(key)
+
+    def _expire_handoffs(self) -> None:
+        now = time.monotonic()
+        for transfer_id in [tid for tid, h in self._outbound.items() if now - h.last_activity > ChordSettings.HANDOFF_TTL]:
+            logger.warning(f"Dropping abandoned handoff {transfer_id}")
+            del self._outbound[transfer_id]
+
     def get_keys_in_range_local(self, start: int, end: int) -> List[str]:
          return self.data_store.get_keys_in_range(start, end)
 
     def transfer_keys_local(self, keys: List[str]) -> Dict[str, Any]:
-        return self.data_store.transfer_keys(keys)
+        expires = self.data_store.expirations_for(keys)
+        versions = {key: version for key, version in self.data_store.versions_for(keys).items() if version is not None}
+        return {'data': self.data_store.transfer_keys(keys), 'expires': expires, 'versions': versions}
 
-    def receive_keys(self, key_value_dict: Dict[str, Any]) -> None:
-        self.data_store.receive_keys(key_value_dict)
\ No newline at end of file
+    def receive_keys(self, key_value_dict: Dict[str, Any], force: bool = False, expires: Optional[Dict[str, float]] = None,
+                     versions: Optional[Dict[str, int]] = None) -> List[str]:
+        return self.data_store.receive_keys(key_value_dict, force, expires, versions)
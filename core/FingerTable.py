@@ -1,6 +1,7 @@
-from typing import List, Optional, TYPE_CHECKING
+import asyncio
+from bisect import bisect_left, bisect_right
+from typing import Dict, Iterator, List, Optional, Set, Tuple, TYPE_CHECKING
 from config.Settings import ChordSettings
-from utils.ChordMath import ChordMath
 from config.LoggingConfig import get_logger
 from .NodeRef import RemoteNode
 
@@ -9,51 +10,227 @@ if TYPE_CHECKING:
 
 logger = get_logger("FingerTable")
 
+FINGER_INIT_MODES = ('bulk', 'sequential')
+
 
 class FingerTable:
 
     def __init__(self, node: 'ChordNode'):
         self.node = node
-        self.fingers: List[Optional['RemoteNode']] = [None] * ChordSettings.M_BIT
         self.next_finger = 0
+        self._reset()
+
+    def _reset(self) -> None:
+        self._run_starts: List[int] = [0]
+        self._run_ids: List[Optional[int]] = [None]
+        self._nodes: Dict[int, 'RemoteNode'] = {}
+        self._run_counts: Dict[int, int] = {}
+        self._distances: List[int] = []
+        self._sorted_nodes: List['RemoteNode'] = []
 
     def _create_remote(self, node_id: int, ip: str, port: int) -> 'RemoteNode':
-        return RemoteNode(node_id, ip, port, self.node.ip, self.node.port)
+        return RemoteNode.shared(node_id, ip, port, self.node.ip, self.node.port)
+
+    def _distance(self, node_id: int) -> int:
+        return (node_id - self.node.id) % ChordSettings.MODULUS
+
+    async def initialize(self, mode: Optional[str] = None) -> None:
+        mode = mode or ChordSettings.FINGER_INIT_MODE
+        if mode not in FINGER_INIT_MODES:
+            raise ValueError(f"Unknown finger table init mode: {mode}")
+        logger.info(f"Finger Table initialization for node: {self.node.id % 1000 if self.node.id is not None else None} ({mode})")
+        if mode == 'bulk':
+            lookups = await self._initialize_bulk()
+        else:
+            lookups = await self._initialize_sequential()
+        logger.info(f"Finger table initialized with {lookups} lookups, {len(self._distances)} distinct fingers")
 
-    async def initialize(self) -> None:
-        logger.info(f"Finger Table initialization for node: {self.node.id % 1000 if self.node.id is not None else None}")
+    def _finger_start(self, index: int) -> int:
+        return (self.node.id + (2 ** index)) % ChordSettings.MODULUS
+
+    def _covers(self, node: 'RemoteNode', index: int) -> bool:
+        return 2 ** index <= (self._distance(node.id) or ChordSettings.MODULUS)
+
+    async def _initialize_sequential(self) -> int:
+        lookups = 0
+        previous = None
         for i in range(ChordSettings.M_BIT):
-            start = (self.node.id + (2 ** i)) % ChordSettings.MODULUS
-            finger = await self.node.topology_manager.find_successor(start)
-            self.fingers[i] = finger
-        logger.info("Finger table initialized")
+            if previous is not None and self._covers(previous, i):
+                self.set_finger(i, previous)
+                continue
+            previous = await self.node.topology_manager.find_successor(self._finger_start(i), use_cache=False)
+            lookups += 1
+            self.set_finger(i, previous)
+        return lookups
+
+    async def _initialize_bulk(self) -> int:
+        successor = self.node.topology_manager.successor
+        known: Dict[int, 'RemoteNode'] = {}
+        if successor is not None and successor.id != self.node.id:
+            known[successor.id] = successor
+            for finger in await successor.get_fingers():
+                if finger.id != self.node.id:
+                    known.setdefault(finger.id, finger)
+        ordered = sorted((self._distance(node_id), node) for node_id, node in known.items())
+        distances = [distance for distance, _ in ordered]
+
+        def guess(index: int) -> Optional['RemoteNode']:
+            position = bisect_left(distances, 2 ** index)
+            return ordered[position][1] if position < len(ordered) else None
+
+        for i in range(ChordSettings.M_BIT):
+            seed = guess(i)
+            if seed is not None:
+                self.set_finger(i, seed)
+
+        semaphore = asyncio.Semaphore(ChordSettings.FINGER_INIT_CONCURRENCY)
+
+        async def resolve(index: int) -> Optional['RemoteNode']:
+            async with semaphore:
+                return await self.node.topology_manager.find_successor(self._finger_start(index), use_cache=False)
+
+        lookups = 0
+        unresolved = list(range(ChordSettings.M_BIT))
+        while unresolved and self.node.running:
+            groups: List[Tuple[int, List[int]]] = []
+            group_of: Dict[Optional[int], List[int]] = {}
+            for i in unresolved:
+                seed = guess(i)
+                key = seed.id if seed is not None else None
+                if key not in group_of:
+                    group_of[key] = []
+                    groups.append((i, group_of[key]))
+                group_of[key].append(i)
+            results = await asyncio.gather(*(resolve(head) for head, _ in groups), return_exceptions=True)
+            lookups += len(groups)
+            unresolved = []
+            for (head, members), result in zip(groups, results):
+                if isinstance(result, BaseException) or result is None:
+                    logger.warning(f"Lookup for finger[{head}] failed during initialization, leaving it to fix_fingers")
+                    continue
+                if result.id != self.node.id and result.id not in known:
+                    known[result.id] = result
+                    position = bisect_left(distances, self._distance(result.id))
+                    distances.insert(position, self._distance(result.id))
+                    ordered.insert(position, (self._distance(result.id), result))
+                self.set_finger(head, result)
+                for i in members[1:]:
+                    if self._covers(result, i):
+                        self.set_finger(i, result)
+                    else:
+                        unresolved.append(i)
+        return lookups
 
     async def fix_fingers(self) -> None:
         self.next_finger = (self.next_finger + 1) % ChordSettings.M_BIT
         start = (self.node.id + (2 ** self.next_finger)) % ChordSettings.MODULUS
         try:
-            finger = await self.node.topology_manager.find_successor(start)
-            self.fingers[self.next_finger] = finger
+            finger = await self.node.topology_manager.find_successor(start, use_cache=False)
+            self.set_finger(self.next_finger, finger)
             logger.debug(f"Updated finger[{self.next_finger}] = {finger.id if finger else None}")
         except Exception as e:
             logger.error(f"Error while updating finger[{self.next_finger}]: {e}")
 
-    def closest_preceding_node(self, key_id: int) -> 'RemoteNode':
-        for i in range(ChordSettings.M_BIT - 1, -1, -1):
-            finger = self.fingers[i]
-            if finger and ChordMath.in_interval(self.node.id, finger.id, key_id, inclusive=False):
-                return finger
+    def get_finger(self, index: int) -> Optional['RemoteNode']:
+        node_id = self._run_ids[bisect_right(self._run_starts, index) - 1]
+        return self._nodes[node_id] if node_id is not None else None
+
+    def set_finger(self, index: int, finger: Optional['RemoteNode']) -> None:
+        node_id = finger.id if finger is not None else None
+        if finger is not None:
+            self._nodes[node_id] = finger
+        run = bisect_right(self._run_starts, index) - 1
+        old_id = self._run_ids[run]
+        if old_id == node_id:
+            return
+        run_start = self._run_starts[run]
+        run_end = self._run_starts[run + 1] if run + 1 < len(self._run_starts) else ChordSettings.M_BIT
+
+        starts, ids = [], []
+        if index > run_start:
+            starts.append(run_start)
+            ids.append(old_id)
+        starts.append(index)
+        ids.append(node_id)
+        if index + 1 < run_end:
+            starts.append(index + 1)
+            ids.append(old_id)
+        for piece_id in ids:
+            self._retain(piece_id)
+        self._release(old_id)
+        self._run_starts[run:run + 1] = starts
+        self._run_ids[run:run + 1] = ids
+        self._merge_runs(run, run + len(starts))
+
+    def _merge_runs(self, first: int, last: int) -> None:
+        i = max(first, 1)
+        while i <= last and i < len(self._run_starts):
+            if self._run_ids[i] == self._run_ids[i - 1]:
+                self._release(self._run_ids[i])
+                del self._run_starts[i]
+                del self._run_ids[i]
+                last -= 1
+            else:
+                i += 1
+
+    def _retain(self, node_id: Optional[int]) -> None:
+        if node_id is None:
+            return
+        count = self._run_counts.get(node_id, 0)
+        self._run_counts[node_id] = count + 1
+        if count == 0:
+            distance = self._distance(node_id)
+            position = bisect_left(self._distances, distance)
+            self._distances.insert(position, distance)
+            self._sorted_nodes.insert(position, self._nodes[node_id])
+        else:
+            position = bisect_left(self._distances, self._distance(node_id))
+            self._sorted_nodes[position] = self._nodes[node_id]
+
+    def _release(self, node_id: Optional[int]) -> None:
+        if node_id is None:
+            return
+        count = self._run_counts[node_id] - 1
+        if count > 0:
+            self._run_counts[node_id] = count
+            return
+        del self._run_counts[node_id]
+        del self._nodes[node_id]
+        position = bisect_left(self._distances, self._distance(node_id))
+        del self._distances[position]
+        del self._sorted_nodes[position]
+
+    @property
+    def fingers(self) -> List[Optional['RemoteNode']]:
+        expanded: List[Optional['RemoteNode']] = []
+        bounds = self._run_starts[1:] + [ChordSettings.M_BIT]
+        for start, end, node_id in zip(self._run_starts, bounds, self._run_ids):
+            expanded.extend([self._nodes[node_id] if node_id is not None else None] * (end - start))
+        return expanded
+
+    def distinct_nodes(self) -> List['RemoteNode']:
+        return list(self._sorted_nodes)
+
+    def closest_preceding_node(self, key_id: int, exclude: Optional[Set[int]] = None) -> 'RemoteNode':
+        for finger in self.preceding_fingers(key_id):
+            if exclude and finger.id in exclude:
+                continue
+            return finger
         return self._create_remote(self.node.id, self.node.ip, self.node.port)
 
+    def preceding_fingers(self, key_id: int) -> Iterator['RemoteNode']:
+        position = bisect_left(self._distances, self._distance(key_id)) - 1
+        while position >= 0 and self._distances[position] > 0:
+            yield self._sorted_nodes[position]
+            position -= 1
+
     def get_fingers(self) -> List[Optional[int]]:
         ids = []
-        for finger in self.fingers:
-            if finger is not None:
-                ids.append(finger.id)
-            else:
-                ids.append(None)
+        bounds = self._run_starts[1:] + [ChordSettings.M_BIT]
+        for start, end, node_id in zip(self._run_starts, bounds, self._run_ids):
+            ids.extend([node_id] * (end - start))
         return ids
 
     def clear(self) -> None:
-        self.fingers = [None] * ChordSettings.M_BIT
-        self.next_finger = 0
\ No newline at end of file
+        self._reset()
+        self.next_finger = 0
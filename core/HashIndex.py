@@ -0,0 +1,134 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterator, List, Tuple
+
+HASH_SIZE = 32
+PREFIX_SHIFT = HASH_SIZE * 8 - 64
+
+
+class HashIndex:
+
+    def __init__(self, block_size: int = 512):
+        self.block_size = block_size
+        self._prefixes: List[array] = []
+        self._hashes: List[bytearray] = []
+        self._keys: List[List[str]] = []
+        self._maxes: List[int] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(hashes) for hashes in self._hashes) + 16 * self._size
+
+    def add(self, key_hash: int, key: str) -> None:
+        if not self._hashes:
+            self._prefixes.append(array('Q', [key_hash >> PREFIX_SHIFT]))
+            self._hashes.append(bytearray(key_hash.to_bytes(HASH_SIZE, 'big')))
+            self._keys.append([key])
+            self._maxes.append(key_hash)
+            self._size = 1
+            return
+        block = min(bisect_left(self._maxes, key_hash), len(self._maxes) - 1)
+        position = self._bisect(block, key_hash, right=True)
+        offset = position * HASH_SIZE
+        self._prefixes[block].insert(position, key_hash >> PREFIX_SHIFT)
+        self._hashes[block][offset:offset] = key_hash.to_bytes(HASH_SIZE, 'big')
+        self._keys[block].insert(position, key)
+        if key_hash > self._maxes[block]:
+            self._maxes[block] = key_hash
+        self._size += 1
+        if len(self._keys[block]) > 2 * self.block_size:
+            self._split(block)
+
+    def discard(self, key_hash: int, key: str) -> bool:
+        block = bisect_left(self._maxes, key_hash)
+        while block < len(self._maxes):
+            keys = self._keys[block]
+            position = self._bisect(block, key_hash)
+            while position < len(keys) and self._hash_at(block, position) == key_hash:
+                if keys[position] == key:
+                    self._delete(block, position)
+                    return True
+                position += 1
+            if position < len(keys):
+                return False
+            block += 1
+        return False
+
+    def irange(self, low: int, high: int) -> Iterator[Tuple[int, str]]:
+        block = bisect_right(self._maxes, low)
+        if block == len(self._maxes):
+            return
+        position = self._bisect(block, low, right=True)
+        while block < len(self._hashes):
+            hashes = self._hashes[block]
+            keys = self._keys[block]
+            stop = len(keys) if self._maxes[block] <= high else self._bisect(block, high, right=True)
+            for i in range(position, stop):
+                yield int.from_bytes(hashes[i * HASH_SIZE:(i + 1) * HASH_SIZE], 'big'), keys[i]
+            if stop < len(keys):
+                return
+            block += 1
+            position = 0
+
+    def find(self, key_hash: int) -> Iterator[Tuple[int, str]]:
+        return self.irange(key_hash - 1, key_hash)
+
+    def __iter__(self) -> Iterator[Tuple[int, str]]:
+        for hashes, keys in zip(self._hashes, self._keys):
+            for i, key in enumerate(keys):
+                yield int.from_bytes(hashes[i * HASH_SIZE:(i + 1) * HASH_SIZE], 'big'), key
+
+    def clear(self) -> None:
+        self._prefixes.clear()
+        self._hashes.clear()
+        self._keys.clear()
+        self._maxes.clear()
+        self._size = 0
+
+    def _hash_at(self, block: int, position: int) -> int:
+        return int.from_bytes(self._hashes[block][position * HASH_SIZE:(position + 1) * HASH_SIZE], 'big')
+
+    def _bisect(self, block: int, key_hash: int, right: bool = False) -> int:
+        prefixes = self._prefixes[block]
+        if key_hash < 0:
+            return 0
+        prefix = key_hash >> PREFIX_SHIFT
+        low = bisect_left(prefixes, prefix)
+        high = bisect_right(prefixes, prefix, low)
+        while low < high:
+            middle = (low + high) // 2
+            current = self._hash_at(block, middle)
+            if current < key_hash or (right and current == key_hash):
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _split(self, block: int) -> None:
+        prefixes = self._prefixes[block]
+        hashes = self._hashes[block]
+        keys = self._keys[block]
+        half = len(keys) // 2
+        cut = half * HASH_SIZE
+        self._prefixes[block:block + 1] = [prefixes[:half], prefixes[half:]]
+        self._hashes[block:block + 1] = [hashes[:cut], hashes[cut:]]
+        self._keys[block:block + 1] = [keys[:half], keys[half:]]
+        self._maxes[block:block + 1] = [int.from_bytes(hashes[cut - HASH_SIZE:cut], 'big'), self._maxes[block]]
+
+    def _delete(self, block: int, position: int) -> None:
+        keys = self._keys[block]
+        del self._prefixes[block][position]
+        del self._hashes[block][position * HASH_SIZE:(position + 1) * HASH_SIZE]
+        del keys[position]
+        self._size -= 1
+        if keys:
+            self._maxes[block] = self._hash_at(block, len(keys) - 1)
+        else:
+            del self._prefixes[block]
+            del self._hashes[block]
+            del self._keys[block]
+            del self._maxes[block]
@@ -0,0 +1,98 @@
+import time
+from bisect import bisect_left, insort
+from collections import OrderedDict
+from typing import Dict, List, Optional, TYPE_CHECKING
+from config.Settings import ChordSettings
+
+if TYPE_CHECKING:
+    from .NodeRef import RemoteNode
+
+
+class CachedRange:
+
+    def __init__(self, owner: 'RemoteNode', low: int, expires_at: float):
+        self.owner = owner
+        self.low = low
+        self.expires_at = expires_at
+
+
+class LocationCache:
+
+    def __init__(self, capacity: int = ChordSettings.LOCATION_CACHE_SIZE, ttl: float = ChordSettings.LOCATION_CACHE_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._ranges: 'OrderedDict[int, CachedRange]' = OrderedDict()
+        self._owner_ids: List[int] = []
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def lookup(self, key_id: int) -> Optional['RemoteNode']:
+        if not self._owner_ids:
+            self.stats['misses'] += 1
+            return None
+        position = bisect_left(self._owner_ids, key_id)
+        owner_id = self._owner_ids[position % len(self._owner_ids)]
+        cached = self._ranges[owner_id]
+        if cached.expires_at < time.monotonic():
+            self._remove(owner_id)
+            self.stats['misses'] += 1
+            return None
+        if self._distance(key_id, owner_id) > self._distance(cached.low, owner_id):
+            self.stats['misses'] += 1
+            return None
+        self._ranges.move_to_end(owner_id)
+        self.stats['hits'] += 1
+        return cached.owner
+
+    def record(self, key_id: int, owner: 'RemoteNode') -> None:
+        cached = self._ranges.get(owner.id)
+        expires_at = time.monotonic() + self.ttl
+        if cached is None:
+            self._ranges[owner.id] = CachedRange(owner, key_id, expires_at)
+            insort(self._owner_ids, owner.id)
+            self._trim_overlaps(owner.id)
+            while len(self._ranges) > self.capacity:
+                self._remove(next(iter(self._ranges)))
+            return
+        if self._distance(key_id, owner.id) > self._distance(cached.low, owner.id):
+            cached.low = key_id
+            self._trim_overlaps(owner.id)
+        cached.owner = owner
+        cached.expires_at = expires_at
+        self._ranges.move_to_end(owner.id)
+
+    def invalidate(self, owner_id: int) -> None:
+        if owner_id in self._ranges:
+            self._remove(owner_id)
+            self.stats['invalidations'] += 1
+
+    def invalidate_key(self, key_id: int) -> None:
+        if not self._owner_ids:
+            return
+        owner_id = self._owner_ids[bisect_left(self._owner_ids, key_id) % len(self._owner_ids)]
+        self.invalidate(owner_id)
+
+    def clear(self) -> None:
+        self._ranges.clear()
+        self._owner_ids.clear()
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, entries=len(self._ranges))
+
+    @staticmethod
+    def _distance(key_id: int, owner_id: int) -> int:
+        return (owner_id - key_id) % ChordSettings.MODULUS
+
+    def _trim_overlaps(self, owner_id: int) -> None:
+        cached = self._ranges[owner_id]
+        while len(self._owner_ids) > 1:
+            previous_id = self._owner_ids[bisect_left(self._owner_ids, owner_id) - 1]
+            if self._distance(previous_id, owner_id) > self._distance(cached.low, owner_id):
+                break
+            self._remove(previous_id)
+
+    def _remove(self, owner_id: int) -> None:
+        del self._ranges[owner_id]
+        del self._owner_ids[bisect_left(self._owner_ids, owner_id)]
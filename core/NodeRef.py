@@ -1,4 +1,5 @@
-from typing import Optional, List, Dict, Any
+import weakref
+from typing import Optional, List, Dict, Any, Tuple
 from network.RpcClient import RPCClient
 from config.LoggingConfig import get_logger
 
@@ -18,14 +19,25 @@ class NodeRef:
 
 class RemoteNode(NodeRef):
 
+    _registry: 'weakref.WeakValueDictionary[Tuple[int, str, int, str, int], RemoteNode]' = weakref.WeakValueDictionary()
+
     def __init__(self, node_id: int, ip: str, port: int, local_ip: str = "0.0.0.0", local_port: int = 0):
             super().__init__(node_id, ip, port)
             self._local_ip = local_ip
             self._local_port = local_port
-            self.rpc = RPCClient(local_ip, local_port)
+            self.rpc = RPCClient.shared(local_ip, local_port)
+
+    @classmethod
+    def shared(cls, node_id: int, ip: str, port: int, local_ip: str = "0.0.0.0", local_port: int = 0) -> 'RemoteNode':
+            key = (node_id, ip, port, local_ip, local_port)
+            node = cls._registry.get(key)
+            if node is None:
+                node = cls(node_id, ip, port, local_ip, local_port)
+                cls._registry[key] = node
+            return node
 
     def _create_remote(self, node_id: int, ip: str, port: int) -> 'RemoteNode':
-            return RemoteNode(node_id, ip, port, self._local_ip, self._local_port)
+            return RemoteNode.shared(node_id, ip, port, self._local_ip, self._local_port)
 
     async def find_successor(self, key_id: int) -> Optional['RemoteNode']:
             result = await self.rpc.send_request(
@@ -66,6 +78,22 @@ class RemoteNode(NodeRef):
                 return self._create_remote(result['id'], result['ip'], result['port'])
             return None
 
+    async def get_fingers(self) -> List['RemoteNode']:
+            result = await self.rpc.send_request(
+                self.ip, self.port, "GET_FINGERS"
+            )
+            if result:
+                return [self._create_remote(node['id'], node['ip'], node['port']) for node in result.get('nodes', [])]
+            return []
+
+    async def get_successor_list(self) -> Optional[List['RemoteNode']]:
+            result = await self.rpc.send_request(
+                self.ip, self.port, "GET_SUCCESSOR_LIST"
+            )
+            if result and 'nodes' in result:
+                return [self._create_remote(node['id'], node['ip'], node['port']) for node in result['nodes']]
+            return None
+
     async def get_keys_in_range(self, start: int, end: int) -> List[str]:
             result = await self.rpc.send_request(
                 self.ip, self.port, "GET_KEYS_IN_RANGE", {'start': start, 'end': end}
@@ -78,35 +106,128 @@ class RemoteNode(NodeRef):
             result = await self.rpc.send_request(
                 self.ip, self.port, "TRANSFER_KEYS", {'keys': keys}
             )
-            if result:
-                return result.get('data', {})
-            return {}
+            return result or {}
+
+    async def transfer_range(self, transfer_id: str, start: int, end: int, after: Optional[int], limit: int, max_bytes: int,
+                             digest: bool = False) -> Optional[Dict[str, Any]]:
+            payload = {'transfer_id': transfer_id, 'start': start, 'end': end, 'after': after, 'limit': limit, 'max_bytes': max_bytes}
+            if digest:
+                payload['digest'] = True
+            return await self.rpc.send_request(
+                self.ip, self.port, "TRANSFER_RANGE", payload
+            )
+
+    async def fetch_keys(self, keys: List[str]) -> Optional[Dict[str, Any]]:
+            return await self.rpc.send_request(
+                self.ip, self.port, "FETCH_KEYS", {'keys': keys}
+            )
 
-    async def receive_keys(self, key_value_dict: Dict[str, Any]) -> bool:
+    async def commit_transfer(self, transfer_id: str, start: int, end: int, upto: Optional[int]) -> Optional[Dict[str, Any]]:
+            return await self.rpc.send_request(
+                self.ip, self.port, "COMMIT_TRANSFER", {'transfer_id': transfer_id, 'start': start, 'end': end, 'upto': upto}
+            )
+
+    async def receive_keys(self, key_value_dict: Dict[str, Any], expires: Optional[Dict[str, float]] = None,
+                           versions: Optional[Dict[str, int]] = None) -> bool:
+            payload = {'data': key_value_dict}
+            if expires:
+                payload['expires'] = expires
+            if versions:
+                payload['versions'] = versions
             result = await self.rpc.send_request(
-                self.ip, self.port, "RECEIVE_KEYS", {'data': key_value_dict}
+                self.ip, self.port, "RECEIVE_KEYS", payload
             )
             return result is not None
 
-    async def store_key(self, key: str, value: Any) -> bool:
+    async def store_key(self, key: str, value: Any, expires_at: Optional[float] = None, version: Optional[int] = None) -> bool:
+            payload = {'key': key, 'value': value, 'routed': True}
+            if expires_at is not None:
+                payload['expires_at'] = expires_at
+            if version is not None:
+                payload['version'] = version
             result = await self.rpc.send_request(
-                self.ip, self.port, "STORE_KEY", {'key': key, 'value': value}
+                self.ip, self.port, "STORE_KEY", payload
             )
             return result is not None and result.get('status') == 'ok'
 
-    async def get_key(self, key: str) -> Optional[Any]:
+    async def store_key_direct(self, key: str, value: Any, expires_at: Optional[float] = None, version: Optional[int] = None) -> Optional[str]:
+            payload = {'key': key, 'value': value, 'direct': True}
+            if expires_at is not None:
+                payload['expires_at'] = expires_at
+            if version is not None:
+                payload['version'] = version
             result = await self.rpc.send_request(
-                self.ip, self.port, "GET_KEY", {'key': key}
+                self.ip, self.port, "STORE_KEY", payload
             )
-            if result:
-                return result.get('value')
+            return result.get('status') if result else None
+
+    async def multi_store(self, items: Dict[str, Any], expires: Optional[Dict[str, float]] = None,
+                          versions: Optional[Dict[str, int]] = None) -> Optional[Dict[str, bool]]:
+            payload = {'data': items, 'routed': True}
+            if expires:
+                payload['expires'] = expires
+            if versions:
+                payload['versions'] = versions
+            result = await self.rpc.send_request(
+                self.ip, self.port, "MULTI_STORE", payload
+            )
+            if result and 'results' in result:
+                return result['results']
+            return None
+
+    async def multi_get(self, keys: List[str]) -> Optional[Dict[str, Any]]:
+            result = await self.rpc.send_request(
+                self.ip, self.port, "MULTI_GET", {'keys': keys, 'routed': True}
+            )
+            if result and 'values' in result:
+                return result['values']
             return None
 
+    async def get_key(self, key: str, local_only: bool = False) -> Optional[Any]:
+            value, _ = await self.get_key_entry(key, local_only)
+            return value
+
+    async def get_key_entry(self, key: str, local_only: bool = False, reader: Optional[NodeRef] = None) -> Tuple[Optional[Any], Optional[int]]:
+            payload = {'key': key}
+            if local_only:
+                payload['local'] = True
+            if reader is not None:
+                payload['reader'] = reader.as_dict()
+            result = await self.rpc.send_request(
+                self.ip, self.port, "GET_KEY", payload
+            )
+            if result:
+                return result.get('value'), result.get('version')
+            return None, None
+
+    async def invalidate_keys(self, versions: Dict[str, int]) -> bool:
+            result = await self.rpc.send_request(
+                self.ip, self.port, "INVALIDATE_KEYS", {'keys': versions}
+            )
+            return result is not None and result.get('status') == 'ok'
+
     async def ping(self) -> bool:
             return await self.rpc.ping(self.ip, self.port)
 
-    async def store_replica(self, key: str, value: Any) -> bool:
+    async def store_replica(self, key: str, value: Any, expires_at: Optional[float] = None, version: Optional[int] = None) -> bool:
+            payload = {'key': key, 'value': value}
+            if expires_at is not None:
+                payload['expires_at'] = expires_at
+            if version is not None:
+                payload['version'] = version
             result = await self.rpc.send_request(
-                self.ip, self.port, "STORE_REPLICA", {'key': key, 'value': value}
+                self.ip, self.port, "STORE_REPLICA", payload
             )
-            return result is not None and result.get('status') == 'ok'
\ No newline at end of file
+            return result is not None and result.get('status') == 'ok'
+
+    async def store_replicas(self, items: Dict[str, Any], expires: Optional[Dict[str, float]] = None,
+                             versions: Optional[Dict[str, int]] = None) -> bool:
+            payload = {'data': items}
+            if expires:
+                payload['expires'] = expires
+            if versions:
+                payload['versions'] = versions
+            result = await self.rpc.send_request(
+                self.ip, self.port, "STORE_REPLICAS", payload
+            )
+            return result is not None and result.get('status') == 'ok'
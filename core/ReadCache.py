@@ -0,0 +1,127 @@
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from config.Settings import ChordSettings
+from .DataTransferManager import approximate_size
+
+Peer = Tuple[int, str, int]
+
+
+class CachedValue:
+
+    def __init__(self, value: Any, version: int, size: int, expires_at: float):
+        self.value = value
+        self.version = version
+        self.size = size
+        self.expires_at = expires_at
+
+
+class ReadCache:
+
+    def __init__(self, max_bytes: int = ChordSettings.READ_CACHE_BYTES, ttl: float = ChordSettings.READ_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.bytes = 0
+        self._entries: 'OrderedDict[str, CachedValue]' = OrderedDict()
+        self._fences: 'OrderedDict[str, Tuple[int, float]]' = OrderedDict()
+        self.stats = {'hits': 0, 'misses': 0, 'invalidations': 0, 'evictions': 0}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats['misses'] += 1
+            return None
+        if entry.expires_at < time.monotonic():
+            self._remove(key)
+            self.stats['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats['hits'] += 1
+        return entry.value
+
+    def put(self, key: str, value: Any, version: int) -> bool:
+        now = time.monotonic()
+        fence = self._fences.get(key)
+        if fence is not None:
+            if fence[1] < now:
+                del self._fences[key]
+            elif version <= fence[0]:
+                return False
+        current = self._entries.get(key)
+        if current is not None and current.version > version:
+            return False
+        size = len(key) + approximate_size(value)
+        if size > self.max_bytes:
+            return False
+        if current is not None:
+            self._remove(key)
+        self._entries[key] = CachedValue(value, version, size, now + self.ttl)
+        self.bytes += size
+        while self.bytes > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.stats['evictions'] += 1
+        return True
+
+    def invalidate(self, key: str, version: int) -> None:
+        now = time.monotonic()
+        fence = self._fences.pop(key, None)
+        if fence is None or fence[0] < version or fence[1] < now:
+            fence = (version, now + self.ttl)
+        self._fences[key] = fence
+        while self._fences and next(iter(self._fences.values()))[1] < now:
+            self._fences.popitem(last=False)
+        if key in self._entries:
+            self._remove(key)
+            self.stats['invalidations'] += 1
+
+    def discard(self, key: str) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._fences.clear()
+        self.bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        return dict(self.stats, entries=len(self._entries), bytes=self.bytes)
+
+    def _remove(self, key: str) -> None:
+        self.bytes -= self._entries.pop(key).size
+
+
+class ReadSubscriptions:
+
+    def __init__(self, capacity: int = ChordSettings.READ_CACHE_TRACKED_KEYS, ttl: float = ChordSettings.READ_CACHE_TTL):
+        self.capacity = capacity
+        self.ttl = ttl
+        self._readers: 'OrderedDict[str, Dict[Peer, float]]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._readers)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._readers
+
+    def track(self, key: str, peer: Peer) -> None:
+        readers = self._readers.get(key)
+        if readers is None:
+            readers = self._readers[key] = {}
+        else:
+            self._readers.move_to_end(key)
+        readers[peer] = time.monotonic() + self.ttl
+        while len(self._readers) > self.capacity:
+            self._readers.popitem(last=False)
+
+    def take(self, key: str) -> List[Peer]:
+        readers = self._readers.pop(key, None)
+        if not readers:
+            return []
+        now = time.monotonic()
+        return [peer for peer, expires_at in readers.items() if expires_at >= now]
+
+    def clear(self) -> None:
+        self._readers.clear()
@@ -0,0 +1,215 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
+from config.LoggingConfig import get_logger
+from config.Settings import ChordSettings
+
+if TYPE_CHECKING:
+    from .NodeRef import RemoteNode
+
+logger = get_logger("ReplicationManager")
+
+
+class ReplicaWrite:
+
+    def __init__(self, future: asyncio.Future, remaining: int):
+        self.future = future
+        self.remaining = remaining
+
+    def settle(self, ok: bool) -> None:
+        if self.future.done():
+            return
+        self.remaining -= 1
+        if not ok:
+            self.future.set_result(False)
+        elif self.remaining <= 0:
+            self.future.set_result(True)
+
+
+class PendingReplica:
+
+    def __init__(self, value: Any, enqueued_at: float, expires_at: Optional[float] = None, version: Optional[int] = None):
+        self.value = value
+        self.enqueued_at = enqueued_at
+        self.expires_at = expires_at
+        self.version = version
+        self.attempts = 0
+        self.writes: List[ReplicaWrite] = []
+
+
+class ReplicaQueue:
+
+    def __init__(self, successor: 'RemoteNode'):
+        self.successor = successor
+        self.pending: 'OrderedDict[str, PendingReplica]' = OrderedDict()
+        self.wakeup = asyncio.Event()
+        self.space = asyncio.Condition()
+        self.task: asyncio.Task = None
+        self.shipped = 0
+        self.coalesced = 0
+        self.batches = 0
+        self.failures = 0
+        self.last_ack = 0.0
+
+    def lag(self, now: float) -> float:
+        if not self.pending:
+            return 0.0
+        return now - next(iter(self.pending.values())).enqueued_at
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            'queued': len(self.pending),
+            'lag': round(self.lag(now), 3),
+            'shipped': self.shipped,
+            'coalesced': self.coalesced,
+            'batches': self.batches,
+            'failures': self.failures,
+            'last_ack_age': round(now - self.last_ack, 3) if self.last_ack else None
+        }
+
+
+class ReplicationManager:
+
+    def __init__(self, batch_size: int = ChordSettings.REPLICATION_BATCH_SIZE, flush_interval: float = ChordSettings.REPLICATION_FLUSH_INTERVAL,
+                 queue_limit: int = ChordSettings.REPLICATION_QUEUE_LIMIT):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue_limit = queue_limit
+        self._queues: Dict[Tuple[str, int], ReplicaQueue] = {}
+
+    async def enqueue(self, successor: 'RemoteNode', items: Dict[str, Any], timeout: float,
+                      expires: Optional[Dict[str, float]] = None, versions: Optional[Dict[str, int]] = None) -> asyncio.Future:
+        queue = self._queue_for(successor)
+        future = asyncio.get_running_loop().create_future()
+        try:
+            if not self._has_space(queue, len(items)):
+                await asyncio.wait_for(self._wait_for_space(queue, len(items)), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Replication queue for {successor.port} full ({len(queue.pending)} keys), dropping {len(items)} writes")
+            future.set_result(False)
+            return future
+        if not items:
+            future.set_result(True)
+            return future
+        write = ReplicaWrite(future, len(items))
+        now = time.monotonic()
+        expires = expires or {}
+        versions = versions or {}
+        for key, value in items.items():
+            entry = queue.pending.get(key)
+            if entry is None:
+                entry = queue.pending[key] = PendingReplica(value, now, expires.get(key), versions.get(key))
+            else:
+                entry.value = value
+                entry.expires_at = expires.get(key)
+                entry.version = versions.get(key)
+                queue.coalesced += 1
+            entry.writes.append(write)
+        queue.wakeup.set()
+        return future
+
+    def retain(self, successors: List['RemoteNode']) -> None:
+        active = {(successor.ip, successor.port) for successor in successors}
+        for peer in [peer for peer in self._queues if peer not in active]:
+            queue = self._queues.pop(peer)
+            logger.info(f"Dropping replication queue for {peer[1]} ({len(queue.pending)} keys), no longer a successor")
+            self._close_queue(queue)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        now = time.monotonic()
+        return {f"{peer[0]}:{peer[1]}": queue.stats(now) for peer, queue in self._queues.items()}
+
+    def max_lag(self) -> float:
+        now = time.monotonic()
+        return max((queue.lag(now) for queue in self._queues.values()), default=0.0)
+
+    def close(self) -> None:
+        for queue in self._queues.values():
+            self._close_queue(queue)
+        self._queues.clear()
+
+    def _queue_for(self, successor: 'RemoteNode') -> ReplicaQueue:
+        peer = (successor.ip, successor.port)
+        queue = self._queues.get(peer)
+        if queue is None:
+            queue = self._queues[peer] = ReplicaQueue(successor)
+            queue.task = asyncio.create_task(self._flush_loop(queue))
+        return queue
+
+    def _has_space(self, queue: ReplicaQueue, count: int) -> bool:
+        return not queue.pending or len(queue.pending) + count <= self.queue_limit
+
+    async def _wait_for_space(self, queue: ReplicaQueue, count: int) -> None:
+        async with queue.space:
+            await queue.space.wait_for(lambda: self._has_space(queue, count))
+
+    async def _flush_loop(self, queue: ReplicaQueue) -> None:
+        retry_delay = 0.0
+        try:
+            while True:
+                await queue.wakeup.wait()
+                if retry_delay:
+                    await asyncio.sleep(retry_delay)
+                elif len(queue.pending) < self.batch_size:
+                    await asyncio.sleep(self.flush_interval)
+                batch = self._take_batch(queue)
+                if not queue.pending:
+                    queue.wakeup.clear()
+                if not batch:
+                    continue
+                values = {key: entry.value for key, entry in batch.items()}
+                expires = {key: entry.expires_at for key, entry in batch.items() if entry.expires_at is not None}
+                versions = {key: entry.version for key, entry in batch.items() if entry.version is not None}
+                try:
+                    ok = await asyncio.wait_for(queue.successor.store_replicas(values, expires, versions), timeout=ChordSettings.REPLICA_WRITE_TIMEOUT)
+                except (OSError, asyncio.TimeoutError):
+                    ok = False
+                if ok:
+                    queue.shipped += len(batch)
+                    queue.batches += 1
+                    queue.last_ack = time.monotonic()
+                    retry_delay = 0.0
+                    for entry in batch.values():
+                        for write in entry.writes:
+                            write.settle(True)
+                else:
+                    queue.failures += 1
+                    retry_delay = min(max(retry_delay * 2, ChordSettings.REPLICATION_RETRY_DELAY), ChordSettings.REPLICATION_MAX_RETRY_DELAY)
+                    self._requeue(queue, batch)
+                    logger.debug(f"Replication batch of {len(batch)} keys to {queue.successor.port} failed, retrying in {retry_delay}s")
+                async with queue.space:
+                    queue.space.notify_all()
+        except asyncio.CancelledError:
+            pass
+
+    def _take_batch(self, queue: ReplicaQueue) -> Dict[str, PendingReplica]:
+        batch = {}
+        while queue.pending and len(batch) < self.batch_size:
+            key, entry = queue.pending.popitem(last=False)
+            batch[key] = entry
+        return batch
+
+    def _requeue(self, queue: ReplicaQueue, batch: Dict[str, PendingReplica]) -> None:
+        for key, entry in reversed(list(batch.items())):
+            entry.attempts += 1
+            if entry.attempts >= ChordSettings.REPLICATION_MAX_ATTEMPTS:
+                for write in entry.writes:
+                    write.settle(False)
+                entry.writes = []
+            newer = queue.pending.get(key)
+            if newer is not None:
+                newer.writes.extend(entry.writes)
+                continue
+            queue.pending[key] = entry
+            queue.pending.move_to_end(key, last=False)
+        if queue.pending:
+            queue.wakeup.set()
+
+    def _close_queue(self, queue: ReplicaQueue) -> None:
+        if queue.task:
+            queue.task.cancel()
+        for entry in queue.pending.values():
+            for write in entry.writes:
+                write.settle(False)
+        queue.pending.clear()
@@ -1,52 +1,140 @@
 import asyncio
-from typing import Optional, List, TYPE_CHECKING
+from typing import Optional, List, Set, TYPE_CHECKING
 from config.LoggingConfig import get_logger
+from config.Settings import ChordSettings
 from utils.ChordMath import ChordMath
+from fault_tolerance.LivenessTracker import LivenessTracker
 from .NodeRef import RemoteNode, NodeRef
+from .LocationCache import LocationCache
 
 if TYPE_CHECKING:
     from .ChordNode import ChordNode
 
 logger = get_logger("TopologyManager")
 
+LOOKUP_MODES = ('recursive', 'iterative')
+
 
 class TopologyManager:
-    def __init__(self, node: 'ChordNode'):
+    def __init__(self, node: 'ChordNode', lookup_mode: Optional[str] = None):
         self.node = node
+        self.lookup_mode = lookup_mode or ChordSettings.LOOKUP_MODE
+        if self.lookup_mode not in LOOKUP_MODES:
+            raise ValueError(f"Unknown lookup mode: {self.lookup_mode}")
+        self.last_lookup_hops = 0
+        self.lookup_stats = {'lookups': 0, 'hops': 0, 'max_hops': 0, 'hop_failures': 0}
         self.successor: Optional['RemoteNode'] = None
         self.predecessor: Optional['RemoteNode'] = None
         self.successor_list: List['RemoteNode'] = []
         self.successor = self._create_remote(node.id, node.ip, node.port)
         self._successor_recovery_lock = asyncio.Lock()
+        self._liveness = LivenessTracker.shared()
+        self.location_cache = LocationCache()
 
     def _create_remote(self, node_id: int, ip: str, port: int) -> 'RemoteNode':
-        return RemoteNode(node_id, ip, port, self.node.ip, self.node.port)
+        return RemoteNode.shared(node_id, ip, port, self.node.ip, self.node.port)
 
-    async def find_successor(self, key_id: int) -> Optional['RemoteNode']:
+    async def find_successor(self, key_id: int, use_cache: bool = True) -> Optional['RemoteNode']:
         if self.successor and self.successor.id == self.node.id:
             return self.successor
 
         if self.successor and ChordMath.in_interval(self.node.id, key_id, self.successor.id):
             return self.successor
 
+        if use_cache:
+            cached = self.location_cache.lookup(key_id)
+            if cached is not None:
+                if not self._liveness.is_suspected(cached.ip, cached.port):
+                    return cached
+                self.location_cache.invalidate(cached.id)
+
         closest = await self.closest_preceding_node(key_id)
         if closest.id == self.node.id:
             return self.successor
-        try:
-            return await closest.find_successor(key_id)
-        except Exception as e:
-            logger.error(f"Error in find_successor for {key_id}: {e}")
-            return self.successor
+        if self.lookup_mode == 'iterative':
+            result = await self._find_successor_iterative(key_id, closest)
+        else:
+            result = await self._find_successor_recursive(key_id, closest)
+        if result is not None and result.id != self.node.id:
+            self.location_cache.record(key_id, result)
+        return result
+
+    def owns(self, key_id: int) -> bool:
+        if self.predecessor is None:
+            return True
+        return ChordMath.in_interval(self.predecessor.id, key_id, self.node.id)
+
+    async def _find_successor_recursive(self, key_id: int, closest: 'RemoteNode') -> Optional['RemoteNode']:
+        failed = {self.node.id}
+        attempts = 0
+        while closest.id not in failed:
+            if not self.node.running: break
+            attempts += 1
+            try:
+                result = await closest.find_successor(key_id)
+                if result is not None:
+                    self._record_lookup(attempts)
+                    return result
+            except Exception as e:
+                logger.error(f"Error in find_successor for {key_id}: {e}")
+            self.lookup_stats['hop_failures'] += 1
+            failed.add(closest.id)
+            logger.debug(f"Lookup through node {closest.id % 1000} failed, falling back to the next preceding finger")
+            closest = await self.closest_preceding_node(key_id, exclude=failed)
+        self._record_lookup(attempts)
+        return self.successor
 
-    async def closest_preceding_node(self, key_id: int) -> 'RemoteNode':
-        closest = self.node.finger_table.closest_preceding_node(key_id)
-        if closest.id != self.node.id:
+    async def _find_successor_iterative(self, key_id: int, current: 'RemoteNode') -> Optional['RemoteNode']:
+        failed = {self.node.id}
+        hops = 0
+        while hops < ChordSettings.LOOKUP_MAX_HOPS:
+            if not self.node.running: break
+            hops += 1
             try:
-                if await closest.ping():
-                    return closest
-            except OSError:
-                pass
-        if self.successor and self.successor.id != self.node.id:
+                successor, next_hop = await asyncio.wait_for(
+                    asyncio.gather(current.get_successor(), current.closest_preceding_node(key_id)),
+                    timeout=ChordSettings.LOOKUP_HOP_TIMEOUT
+                )
+            except (OSError, asyncio.TimeoutError):
+                successor = next_hop = None
+
+            if successor is None:
+                self.lookup_stats['hop_failures'] += 1
+                self._liveness.record_failure(current.ip, current.port)
+                failed.add(current.id)
+                logger.debug(f"Lookup hop {hops} to node {current.id % 1000} failed, trying an alternate finger")
+                alternate = await self.closest_preceding_node(key_id, exclude=failed)
+                if alternate.id in failed:
+                    break
+                current = alternate
+                continue
+
+            if successor.id == current.id or ChordMath.in_interval(current.id, key_id, successor.id):
+                self._record_lookup(hops)
+                return successor
+            if next_hop is None or next_hop.id == current.id or next_hop.id in failed:
+                next_hop = successor
+            current = next_hop
+
+        logger.warning(f"Iterative lookup for {key_id % 1000} gave up after {hops} hops")
+        self._record_lookup(hops)
+        return self.successor
+
+    def _record_lookup(self, hops: int) -> None:
+        self.last_lookup_hops = hops
+        self.lookup_stats['lookups'] += 1
+        self.lookup_stats['hops'] += hops
+        if hops > self.lookup_stats['max_hops']:
+            self.lookup_stats['max_hops'] = hops
+
+    async def closest_preceding_node(self, key_id: int, exclude: Optional[Set[int]] = None) -> 'RemoteNode':
+        for finger in self.node.finger_table.preceding_fingers(key_id):
+            if exclude and finger.id in exclude:
+                continue
+            if self._liveness.is_suspected(finger.ip, finger.port):
+                continue
+            return finger
+        if self.successor and self.successor.id != self.node.id and not (exclude and self.successor.id in exclude):
             if ChordMath.in_interval(self.node.id, self.successor.id, key_id, inclusive=False):
                 return self.successor
         return self._create_remote(self.node.id, self.node.ip, self.node.port)
@@ -77,28 +165,34 @@ class TopologyManager:
 
     async def _update_successor_list(self) -> None:
         try:
-            max_successors = self.node.replication_factor
-            new_list = []
-            seen_ids = {self.node.id}
-            current = self.successor
-
-            while len(new_list) < max_successors and current and current.id not in seen_ids:
-                seen_ids.add(current.id)
-                new_list.append(current)
-                try:
-                    next_suc = await current.get_successor()
-                    if next_suc and next_suc.id not in seen_ids:
-                        current = self._create_remote(next_suc.id, next_suc.ip, next_suc.port)
-                    else:
-                        break
-                except (OSError, asyncio.TimeoutError):
-                    break
-
-            self.successor_list = new_list
+            self.successor_list = await self._fetch_successor_list(self._successor_list_size())
             logger.debug(f"Successor list updated: {len(self.successor_list)} nodes")
         except Exception as e:
             logger.error(f"Error updating successor list: {e}")
 
+    def _successor_list_size(self) -> int:
+        return max(self.node.replication_factor, ChordSettings.SUCCESSOR_LIST_SIZE)
+
+    async def _fetch_successor_list(self, count: int) -> List['RemoteNode']:
+        successor = self.successor
+        if not successor or successor.id == self.node.id:
+            return []
+        try:
+            remote_list = await successor.get_successor_list()
+        except (OSError, asyncio.TimeoutError):
+            remote_list = None
+        if remote_list is None:
+            return await self._walk_successors(count)
+        successors = [successor]
+        seen_ids = {self.node.id, successor.id}
+        for node in remote_list:
+            if len(successors) >= count or node.id == self.node.id:
+                break
+            if node.id not in seen_ids:
+                seen_ids.add(node.id)
+                successors.append(node)
+        return successors
+
     async def notify(self, node_ref: 'NodeRef') -> None:
         should_update = (
                 not self.predecessor or
@@ -137,8 +231,8 @@ class TopologyManager:
                             return
                     except OSError:
                         continue
-            for finger in self.node.finger_table.fingers:
-                if finger and finger.id != self.node.id and finger.id != old_successor_id:
+            for finger in self.node.finger_table.distinct_nodes():
+                if finger.id != self.node.id and finger.id != old_successor_id:
                     try:
                         if await finger.ping():
                             logger.info(f"New successor from finger table: {finger.id % 1000 if finger.id is not None else None}")
@@ -160,6 +254,13 @@ class TopologyManager:
     async def get_successor_list(self, count: int) -> List['RemoteNode']:
         if self.successor_list and len(self.successor_list) >= count:
             return self.successor_list[:count]
+        try:
+            return (await self._fetch_successor_list(count))[:count]
+        except Exception as e:
+            logger.error(f"Unexpected error in get_successor_list: {e}")
+            return self.successor_list[:count]
+
+    async def _walk_successors(self, count: int) -> List['RemoteNode']:
         successors = []
         seen_ids = {self.node.id}
         current = self.successor
@@ -179,7 +280,7 @@ class TopologyManager:
             except (OSError, asyncio.TimeoutError):
                 break
             except Exception as e:
-                logger.error(f"Unexpected error in get_successor_list: {e}")
+                logger.error(f"Unexpected error while walking successors: {e}")
                 break
 
         return successors
\ No newline at end of file
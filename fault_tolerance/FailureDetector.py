@@ -2,6 +2,8 @@ import asyncio
 from typing import Optional, TYPE_CHECKING
 from config.Settings import FailureDetectorSettings
 from config.LoggingConfig import get_logger
+from network.ConnectionPool import ConnectionPool
+from .LivenessTracker import LivenessTracker
 
 if TYPE_CHECKING:
     from core.ChordNode import ChordNode
@@ -75,6 +77,8 @@ class FailureDetector:
 
         if self.successor_failures >= FailureDetectorSettings.FAILURE_THRESHOLD:
             logger.error(f"Successor {successor.id % 1000 if successor.id is not None else None} declared dead")
+            LivenessTracker.shared().mark_dead(successor.ip, successor.port)
+            ConnectionPool.for_running_loop().close_peer(successor.ip, successor.port)
             asyncio.create_task(self._trigger_successor_recovery())
             self.successor_failures = 0
 
@@ -110,5 +114,7 @@ class FailureDetector:
         logger.warning(f"Predecessor {predecessor.id % 1000 if predecessor.id is not None else None} not responding \n" f"(Attempt {self.predecessor_failures}/{FailureDetectorSettings.FAILURE_THRESHOLD})")
         if self.predecessor_failures >= FailureDetectorSettings.FAILURE_THRESHOLD:
             logger.error(f"Predecessor {predecessor.id % 1000 if predecessor.id is not None else None} declared dead")
+            LivenessTracker.shared().mark_dead(predecessor.ip, predecessor.port)
+            ConnectionPool.for_running_loop().close_peer(predecessor.ip, predecessor.port)
             self.node.topology_manager.predecessor = None
             self.predecessor_failures = 0
\ No newline at end of file
@@ -0,0 +1,68 @@
+import time
+from typing import Dict, Tuple, Optional
+from config.Settings import FailureDetectorSettings
+from config.LoggingConfig import get_logger
+
+logger = get_logger("LivenessTracker")
+
+
+class PeerLiveness:
+
+    def __init__(self):
+        self.last_success = 0.0
+        self.last_failure = 0.0
+        self.consecutive_failures = 0
+        self.declared_dead_at = 0.0
+
+
+class LivenessTracker:
+
+    _shared: Optional['LivenessTracker'] = None
+
+    def __init__(self, suspect_ttl: float = FailureDetectorSettings.SUSPECT_TTL):
+        self.suspect_ttl = suspect_ttl
+        self._peers: Dict[Tuple[str, int], PeerLiveness] = {}
+
+    @classmethod
+    def shared(cls) -> 'LivenessTracker':
+        if cls._shared is None:
+            cls._shared = cls()
+        return cls._shared
+
+    def record_success(self, ip: str, port: int) -> None:
+        peer = self._peer(ip, port)
+        peer.last_success = time.monotonic()
+        peer.consecutive_failures = 0
+        peer.declared_dead_at = 0.0
+
+    def record_failure(self, ip: str, port: int) -> None:
+        peer = self._peer(ip, port)
+        peer.last_failure = time.monotonic()
+        peer.consecutive_failures += 1
+
+    def mark_dead(self, ip: str, port: int) -> None:
+        peer = self._peer(ip, port)
+        peer.declared_dead_at = time.monotonic()
+        logger.debug(f"Peer {ip}:{port} reported dead")
+
+    def _peer(self, ip: str, port: int) -> PeerLiveness:
+        peer = self._peers.get((ip, port))
+        if peer is None:
+            peer = self._peers[(ip, port)] = PeerLiveness()
+        return peer
+
+    def is_suspected(self, ip: str, port: int) -> bool:
+        peer = self._peers.get((ip, port))
+        if peer is None:
+            return False
+        now = time.monotonic()
+        if peer.declared_dead_at and now - peer.declared_dead_at < self.suspect_ttl:
+            return True
+        return peer.consecutive_failures > 0 and peer.last_failure > peer.last_success and now - peer.last_failure < self.suspect_ttl
+
+    def last_success(self, ip: str, port: int) -> float:
+        peer = self._peers.get((ip, port))
+        return peer.last_success if peer else 0.0
+
+    def forget(self, ip: str, port: int) -> None:
+        self._peers.pop((ip, port), None)
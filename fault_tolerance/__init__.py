@@ -1,3 +1,4 @@
 from .FailureDetector import FailureDetector
+from .LivenessTracker import LivenessTracker
 
-__all__ = ['FailureDetector']
\ No newline at end of file
+__all__ = ['FailureDetector', 'LivenessTracker']
\ No newline at end of file
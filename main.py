@@ -4,8 +4,9 @@ import random
 from core.ChordNode import ChordNode
 from network.SocketServer import SocketServer
 from network.MessageProtocol import MessageProtocol
+from network.ConnectionPool import ConnectionPool
 from config.LoggingConfig import setup_logging
-from config.Settings import ChordSettings, SecuritySettings
+from config.Settings import ChordSettings, SecuritySettings, StorageSettings
 from fault_tolerance.FailureDetector import FailureDetector
 
 logger = setup_logging()
@@ -53,12 +54,44 @@ async def status_loop(node: ChordNode) -> None:
         logger.error(f"Status loop error: {e}")
 
 
-async def run_node(host: str, port: int, bootstrap_ip=None, bootstrap_port=None) -> None:
+async def storage_loop(node: ChordNode) -> None:
+    try:
+        while True:
+            if not node.running: break
+            await asyncio.sleep(StorageSettings.SNAPSHOT_INTERVAL)
+            await node.data_store.checkpoint()
+    except asyncio.CancelledError:
+        return
+    except Exception as e:
+        logger.error(f"Storage loop error: {e}")
+
+
+async def expiry_loop(node: ChordNode) -> None:
+    try:
+        while True:
+            if not node.running: break
+            await asyncio.sleep(StorageSettings.EXPIRY_SWEEP_INTERVAL)
+            expired = node.data_store.expire()
+            while node.running and node.data_store.expiry_due():
+                await asyncio.sleep(0)
+                expired += node.data_store.expire()
+            if expired:
+                logger.info(f"Expired {expired} keys on node {node.port}")
+    except asyncio.CancelledError:
+        return
+    except Exception as e:
+        logger.error(f"Expiry loop error: {e}")
+
+
+async def run_node(host: str, port: int, bootstrap_ip=None, bootstrap_port=None, lookup_mode=None, write_ack_level=None, read_cache=None,
+                   storage=None) -> None:
     encryption_key = SecuritySettings.SECRET_KEY if SecuritySettings.ENCRYPTION_ENABLED else None
-    protocol = MessageProtocol(encryption_key=encryption_key)
+    protocol = MessageProtocol.shared(encryption_key)
     server = SocketServer(host, port, protocol)
-    node = ChordNode(host, port)
+    node = ChordNode(host, port, lookup_mode, write_ack_level, read_cache=read_cache, storage=storage)
     server.set_node(node)
+    pool = ConnectionPool.for_running_loop()
+    pool.retain()
 
     server_task = asyncio.create_task(server.start())
     await asyncio.sleep(0.5)
@@ -73,6 +106,8 @@ async def run_node(host: str, port: int, bootstrap_ip=None, bootstrap_port=None)
 
     maintenance_task = asyncio.create_task(maintenance_loop(node))
     status_task = asyncio.create_task(status_loop(node))
+    storage_task = asyncio.create_task(storage_loop(node))
+    expiry_task = asyncio.create_task(expiry_loop(node))
 
     logger.info(f"Chord node {node.id % 1000 if node.id is not None else None} running on {host}:{port}")
 
@@ -86,8 +121,11 @@ async def run_node(host: str, port: int, bootstrap_ip=None, bootstrap_port=None)
         await failure_detector.stop()
         maintenance_task.cancel()
         status_task.cancel()
+        storage_task.cancel()
+        expiry_task.cancel()
         await server.stop()
-        await asyncio.gather(maintenance_task, status_task, return_exceptions=True)
+        await pool.release()
+        await asyncio.gather(maintenance_task, status_task, storage_task, expiry_task, return_exceptions=True)
 
         if not server_task.done():
             server_task.cancel()
@@ -0,0 +1,242 @@
+import json
+import struct
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Tuple
+
+_NONE = 0x00
+_FALSE = 0x01
+_TRUE = 0x02
+_INT64 = 0x03
+_ID256 = 0x04
+_BIGINT = 0x05
+_FLOAT = 0x06
+_STR = 0x07
+_BYTES = 0x08
+_LIST = 0x09
+_DICT = 0x0A
+_STR8 = 0x0B
+
+_NONE_TAG = bytes([_NONE])
+_FALSE_TAG = bytes([_FALSE])
+_TRUE_TAG = bytes([_TRUE])
+_ID256_TAG = bytes([_ID256])
+
+_INT64_MIN = -(2 ** 63)
+_INT64_MAX = 2 ** 63 - 1
+_ID256_MAX = 2 ** 256 - 1
+
+_pack_int64 = struct.Struct('!Bq').pack
+_pack_float = struct.Struct('!Bd').pack
+_pack_tagged_len = struct.Struct('!BI').pack
+_pack_tagged_u8 = struct.Struct('!BB').pack
+_unpack_int64 = struct.Struct('!q').unpack_from
+_unpack_float = struct.Struct('!d').unpack_from
+_unpack_len = struct.Struct('!I').unpack_from
+
+
+MESSAGE_FIELDS = ('type', 'payload', 'sender_ip', 'sender_port', 'request_id')
+
+
+class Codec(ABC):
+    name = ''
+    supports_bytes = False
+
+    @abstractmethod
+    def encode(self, obj: Any) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, data: bytes) -> Any:
+        pass
+
+    def encode_message(self, message_dict: Dict[str, Any]) -> bytes:
+        return self.encode(message_dict)
+
+    def decode_message(self, data: bytes) -> Dict[str, Any]:
+        return self.decode(data)
+
+
+class JsonCodec(Codec):
+    name = 'json'
+    supports_bytes = False
+
+    def __init__(self, encoding: str = 'utf-8'):
+        self.encoding = encoding
+
+    def encode(self, obj: Any) -> bytes:
+        return json.dumps(obj).encode(self.encoding)
+
+    def decode(self, data: bytes) -> Any:
+        return json.loads(data.decode(self.encoding))
+
+
+class BinaryCodec(Codec):
+    name = 'binary'
+    supports_bytes = True
+
+    def encode(self, obj: Any) -> bytes:
+        out: List[bytes] = []
+        _encode_value(obj, out)
+        return b''.join(out)
+
+    def decode(self, data: bytes) -> Any:
+        data = bytes(data)
+        value, offset = _decode_value(data, 0)
+        if offset != len(data):
+            raise ValueError(f"Trailing {len(data) - offset} bytes after binary message")
+        return value
+
+    def encode_message(self, message_dict: Dict[str, Any]) -> bytes:
+        return self.encode([message_dict[field] for field in MESSAGE_FIELDS])
+
+    def decode_message(self, data: bytes) -> Dict[str, Any]:
+        fields = self.decode(data)
+        if isinstance(fields, dict):
+            return fields
+        if not isinstance(fields, list):
+            raise ValueError(f"Binary message must be a list or a dict, got {type(fields).__name__}")
+        return dict(zip(MESSAGE_FIELDS, fields))
+
+
+def _encode_value(obj: Any, out: List[bytes]) -> None:
+    kind = type(obj)
+    if kind is str:
+        raw = obj.encode('utf-8')
+        size = len(raw)
+        out.append(_pack_tagged_u8(_STR8, size) if size < 256 else _pack_tagged_len(_STR, size))
+        out.append(raw)
+    elif kind is int:
+        if _INT64_MIN <= obj <= _INT64_MAX:
+            out.append(_pack_int64(_INT64, obj))
+        elif 0 <= obj <= _ID256_MAX:
+            out.append(_ID256_TAG)
+            out.append(obj.to_bytes(32, 'big'))
+        else:
+            raw = obj.to_bytes((obj.bit_length() + 8) // 8, 'big', signed=True)
+            out.append(_pack_tagged_len(_BIGINT, len(raw)))
+            out.append(raw)
+    elif kind is dict:
+        out.append(_pack_tagged_len(_DICT, len(obj)))
+        for key, value in obj.items():
+            _encode_value(key, out)
+            _encode_value(value, out)
+    elif obj is None:
+        out.append(_NONE_TAG)
+    elif kind is bool:
+        out.append(_TRUE_TAG if obj else _FALSE_TAG)
+    elif kind is list or kind is tuple:
+        out.append(_pack_tagged_len(_LIST, len(obj)))
+        for item in obj:
+            _encode_value(item, out)
+    elif kind is bytes or kind is bytearray or kind is memoryview:
+        raw = bytes(obj)
+        out.append(_pack_tagged_len(_BYTES, len(raw)))
+        out.append(raw)
+    elif kind is float:
+        out.append(_pack_float(_FLOAT, obj))
+    elif isinstance(obj, str):
+        _encode_value(str(obj), out)
+    elif isinstance(obj, int):
+        _encode_value(int(obj), out)
+    elif isinstance(obj, float):
+        _encode_value(float(obj), out)
+    elif isinstance(obj, dict):
+        _encode_value(dict(obj), out)
+    elif isinstance(obj, (list, tuple)):
+        _encode_value(list(obj), out)
+    elif isinstance(obj, (bytes, bytearray)):
+        _encode_value(bytes(obj), out)
+    else:
+        raise TypeError(f"Object of type {kind.__name__} is not binary serializable")
+
+
+def _truncated(data: bytes, offset: int, size: int) -> ValueError:
+    return ValueError(f"Truncated binary message: {size} bytes needed at offset {offset}, {max(len(data) - offset, 0)} left")
+
+
+def _decode_value(data: bytes, offset: int) -> Tuple[Any, int]:
+    if offset >= len(data):
+        raise _truncated(data, offset, 1)
+    tag = data[offset]
+    offset += 1
+    if tag == _STR8:
+        if offset >= len(data):
+            raise _truncated(data, offset, 1)
+        end = offset + 1 + data[offset]
+        if end > len(data):
+            raise _truncated(data, offset + 1, data[offset])
+        return data[offset + 1:end].decode('utf-8'), end
+    if tag == _INT64:
+        if offset + 8 > len(data):
+            raise _truncated(data, offset, 8)
+        return _unpack_int64(data, offset)[0], offset + 8
+    if tag == _DICT:
+        if offset + 4 > len(data):
+            raise _truncated(data, offset, 4)
+        count = _unpack_len(data, offset)[0]
+        offset += 4
+        result = {}
+        for _ in range(count):
+            key, offset = _decode_value(data, offset)
+            if isinstance(key, (list, dict)):
+                raise ValueError(f"Unhashable binary dict key of type {type(key).__name__}")
+            result[key], offset = _decode_value(data, offset)
+        return result, offset
+    if tag == _ID256:
+        end = offset + 32
+        if end > len(data):
+            raise _truncated(data, offset, 32)
+        return int.from_bytes(data[offset:end], 'big'), end
+    if tag == _LIST:
+        if offset + 4 > len(data):
+            raise _truncated(data, offset, 4)
+        count = _unpack_len(data, offset)[0]
+        offset += 4
+        items = []
+        for _ in range(count):
+            item, offset = _decode_value(data, offset)
+            items.append(item)
+        return items, offset
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _STR:
+        end = _sized_end(data, offset)
+        return data[offset + 4:end].decode('utf-8'), end
+    if tag == _BYTES:
+        end = _sized_end(data, offset)
+        return data[offset + 4:end], end
+    if tag == _FLOAT:
+        if offset + 8 > len(data):
+            raise _truncated(data, offset, 8)
+        return _unpack_float(data, offset)[0], offset + 8
+    if tag == _BIGINT:
+        end = _sized_end(data, offset)
+        return int.from_bytes(data[offset + 4:end], 'big', signed=True), end
+    raise ValueError(f"Unknown binary tag 0x{tag:02x} at offset {offset - 1}")
+
+
+def _sized_end(data: bytes, offset: int) -> int:
+    if offset + 4 > len(data):
+        raise _truncated(data, offset, 4)
+    size = _unpack_len(data, offset)[0]
+    end = offset + 4 + size
+    if end > len(data):
+        raise _truncated(data, offset + 4, size)
+    return end
+
+
+CODECS: Dict[str, Codec] = {
+    JsonCodec.name: JsonCodec(),
+    BinaryCodec.name: BinaryCodec(),
+}
+
+
+def get_codec(name: str) -> Codec:
+    codec = CODECS.get(name)
+    if codec is None:
+        raise ValueError(f"Unknown codec: {name}")
+    return codec
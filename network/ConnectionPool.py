@@ -0,0 +1,206 @@
+import asyncio
+import itertools
+import time
+import weakref
+from typing import Dict, List, Tuple, Optional, TYPE_CHECKING
+from config.LoggingConfig import get_logger
+from config.Settings import NetworkSettings
+
+if TYPE_CHECKING:
+    from .MessageProtocol import MessageProtocol, ChordMessage, ProtocolSession
+
+logger = get_logger("ConnectionPool")
+
+
+class PooledConnection:
+
+    def __init__(self, peer: Tuple[str, int], reader: asyncio.StreamReader, writer: asyncio.StreamWriter, protocol: 'MessageProtocol', session: 'ProtocolSession'):
+        self.peer = peer
+        self.reader = reader
+        self.writer = writer
+        self.protocol = protocol
+        self.session = session
+        self.last_used = time.monotonic()
+        self.last_received = self.last_used
+        self.requests_started = 0
+        self.requests_written = 0
+        self.closed = False
+        self._request_ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._write_lock = asyncio.Lock()
+        self._reader_task = asyncio.create_task(self._read_loop())
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def is_healthy(self) -> bool:
+        if self.closed or self.writer.is_closing() or self.reader.at_eof():
+            return False
+        return self.reader.exception() is None
+
+    def is_idle_expired(self, idle_timeout: float, now: float) -> bool:
+        return not self._pending and now - self.last_used > idle_timeout
+
+    async def request(self, message: 'ChordMessage', timeout: float) -> 'ChordMessage':
+        request_id = next(self._request_ids)
+        message.request_id = request_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self.requests_started += 1
+        sent_at = time.monotonic()
+        try:
+            async with self._write_lock:
+                if self.closed:
+                    raise ConnectionResetError(f"Connection to {self.peer[0]}:{self.peer[1]} closed before the request was written")
+                self.requests_written += 1
+                await self.protocol.send_message(self.writer, message, self.session)
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            if self.last_received < sent_at:
+                logger.debug(f"Connection to {self.peer[0]}:{self.peer[1]} silent for a whole request, closing it")
+                self.close()
+            raise
+        finally:
+            self._pending.pop(request_id, None)
+            self.last_used = time.monotonic()
+
+    async def _read_loop(self) -> None:
+        try:
+            while True:
+                response = await self.protocol.read_message(self.reader, self.session)
+                if response is None:
+                    break
+                self.last_received = time.monotonic()
+                future = self._pending.get(response.request_id)
+                if future and not future.done():
+                    future.set_result(response)
+                else:
+                    logger.debug(f"Dropping late response {response.type} (request {response.request_id})")
+        finally:
+            self.closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionResetError(f"Connection to {self.peer[0]}:{self.peer[1]} closed"))
+            self.writer.close()
+
+    def close(self) -> None:
+        self.closed = True
+        self.writer.close()
+
+    async def wait_closed(self) -> None:
+        self.close()
+        try:
+            await self.writer.wait_closed()
+        except (OSError, asyncio.TimeoutError):
+            pass
+        if not self._reader_task.done():
+            self._reader_task.cancel()
+        await asyncio.gather(self._reader_task, return_exceptions=True)
+
+
+class ConnectionPool:
+
+    _pools: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, ConnectionPool]' = weakref.WeakKeyDictionary()
+
+    def __init__(self, max_per_peer: int = NetworkSettings.POOL_MAX_PER_PEER, idle_timeout: float = NetworkSettings.POOL_IDLE_TIMEOUT,
+                 max_in_flight: int = NetworkSettings.MAX_IN_FLIGHT_PER_CONNECTION):
+        self.max_per_peer = max_per_peer
+        self.idle_timeout = idle_timeout
+        self.max_in_flight = max_in_flight
+        self._connections: Dict[Tuple[str, int], List[PooledConnection]] = {}
+        self._connecting: Dict[Tuple[str, int], asyncio.Task] = {}
+        self._last_sweep = time.monotonic()
+        self._owners = 0
+
+    @classmethod
+    def for_running_loop(cls) -> 'ConnectionPool':
+        loop = asyncio.get_running_loop()
+        pool = cls._pools.get(loop)
+        if pool is None:
+            pool = cls()
+            cls._pools[loop] = pool
+        return pool
+
+    async def acquire(self, ip: str, port: int, timeout: float, protocol: 'MessageProtocol') -> PooledConnection:
+        peer = (ip, port)
+        self._sweep_idle()
+        conn = self._least_loaded(peer)
+        if conn and (conn.in_flight < self.max_in_flight or len(self._connections[peer]) >= self.max_per_peer):
+            return conn
+        connecting = self._connecting.get(peer)
+        if connecting is None:
+            connecting = asyncio.create_task(self._connect(peer, timeout, protocol))
+            self._connecting[peer] = connecting
+            connecting.add_done_callback(lambda _: self._connecting.pop(peer, None))
+        return await asyncio.shield(connecting)
+
+    def retain(self) -> None:
+        self._owners += 1
+
+    async def release(self) -> None:
+        self._owners -= 1
+        if self._owners <= 0:
+            self._owners = 0
+            await self.close_all()
+
+    def close_peer(self, ip: str, port: int) -> None:
+        for conn in self._connections.pop((ip, port), []):
+            conn.close()
+
+    async def close_all(self) -> None:
+        connections = [conn for conns in self._connections.values() for conn in conns]
+        self._connections.clear()
+        await asyncio.gather(*(conn.wait_closed() for conn in connections), return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'peers': len(self._connections),
+            'open_connections': sum(len(conns) for conns in self._connections.values()),
+            'in_flight': sum(conn.in_flight for conns in self._connections.values() for conn in conns)
+        }
+
+    def _least_loaded(self, peer: Tuple[str, int]) -> Optional[PooledConnection]:
+        conns = self._connections.get(peer)
+        if not conns:
+            return None
+        healthy = []
+        for conn in conns:
+            if conn.is_healthy():
+                healthy.append(conn)
+            else:
+                conn.close()
+        if not healthy:
+            del self._connections[peer]
+            return None
+        self._connections[peer] = healthy
+        return min(healthy, key=lambda conn: conn.in_flight)
+
+    async def _connect(self, peer: Tuple[str, int], timeout: float, protocol: 'MessageProtocol') -> PooledConnection:
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(peer[0], peer[1]), timeout=timeout)
+        try:
+            session = await protocol.client_handshake(reader, writer, timeout)
+        except BaseException:
+            writer.close()
+            raise
+        conn = PooledConnection(peer, reader, writer, protocol, session)
+        self._connections.setdefault(peer, []).append(conn)
+        return conn
+
+    def _sweep_idle(self) -> None:
+        now = time.monotonic()
+        if now - self._last_sweep < self.idle_timeout / 2:
+            return
+        self._last_sweep = now
+        for peer in list(self._connections.keys()):
+            kept = []
+            for conn in self._connections[peer]:
+                if conn.is_healthy() and not conn.is_idle_expired(self.idle_timeout, now):
+                    kept.append(conn)
+                else:
+                    conn.close()
+                    logger.debug(f"Evicted idle connection to {peer[0]}:{peer[1]}")
+            if kept:
+                self._connections[peer] = kept
+            else:
+                del self._connections[peer]
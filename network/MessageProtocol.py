@@ -1,10 +1,11 @@
 import asyncio
-import json
 import struct
-from dataclasses import dataclass, asdict
-from typing import Optional, Dict, Any
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, Sequence, Tuple
 from config.LoggingConfig import get_logger
-from security.Encryption import MessageSecurity
+from config.Settings import NetworkSettings, SecuritySettings
+from security.Encryption import MessageSecurity, SessionCipher, SESSION_CIPHERS
+from .Codec import Codec, JsonCodec, CODECS, get_codec
 
 logger = get_logger("MessageProtocol")
 
@@ -15,40 +16,88 @@ class ChordMessage:
     payload: Dict[str, Any]
     sender_ip: str
     sender_port: int
+    request_id: int = 0
 
     def to_dict(self) -> dict:
-        return asdict(self)
+        return {'type': self.type, 'payload': self.payload, 'sender_ip': self.sender_ip,
+                'sender_port': self.sender_port, 'request_id': self.request_id}
+
+
+@dataclass
+class ProtocolSession:
+    codec: Codec
+    sealed: bool = False
+    cipher: Optional[SessionCipher] = None
 
 
 class MessageProtocol:
 
-    def __init__(self, encoding: str = 'utf-8', encryption_key: str = None):
+    _shared: Dict[Tuple[Any, ...], 'MessageProtocol'] = {}
+
+    def __init__(self, encoding: str = 'utf-8', encryption_key: str = None, codecs: Optional[Sequence[str]] = None,
+                 sealed_frames: Optional[bool] = None, session_ciphers: Optional[Sequence[str]] = None):
+        if codecs is None:
+            codecs = NetworkSettings.CODECS
+        if sealed_frames is None:
+            sealed_frames = SecuritySettings.SEALED_FRAMES
+        if session_ciphers is None:
+            session_ciphers = SecuritySettings.SESSION_CIPHERS if SecuritySettings.SESSION_KEYS else ()
         self.encoding = encoding
+        self.default_codec = JsonCodec(encoding)
+        self.default_session = ProtocolSession(self.default_codec)
+        self.codecs = [name for name in codecs if name in CODECS]
         self.enable_encryption = encryption_key is not None
         if self.enable_encryption:
             self.security = MessageSecurity(encryption_key)
         else:
             self.security = None
+        self.sealed_frames = sealed_frames and self.enable_encryption
+        self.session_ciphers = [name for name in session_ciphers if name in SESSION_CIPHERS] if self.enable_encryption else []
 
-    def _pack(self, message: ChordMessage) -> bytes:
+    @classmethod
+    def shared(cls, encryption_key: Optional[str] = None) -> 'MessageProtocol':
+        key = (encryption_key, tuple(NetworkSettings.CODECS), SecuritySettings.SEALED_FRAMES,
+               SecuritySettings.SESSION_KEYS, tuple(SecuritySettings.SESSION_CIPHERS))
+        protocol = cls._shared.get(key)
+        if protocol is None:
+            protocol = cls(encryption_key=encryption_key)
+            cls._shared[key] = protocol
+        return protocol
+
+    def _pack(self, message: ChordMessage, session: Optional[ProtocolSession] = None) -> bytes:
+        session = session or self.default_session
+        codec = session.codec
         message_dict = message.to_dict()
+        if session.cipher:
+            return session.cipher.seal(codec.encode_message(message_dict))
+        if session.sealed:
+            return self.security.seal_frame(codec.encode_message(message_dict))
         if self.enable_encryption and self.security:
+            if codec.supports_bytes:
+                encrypted_data, signature = self.security.encrypt_frame(codec.encode_message(message_dict))
+                return codec.encode({'encrypted': True, 'data': encrypted_data, 'signature': signature})
             encrypted_data, signature = self.security.encrypt_message(message_dict)
             secure_wrapper = {'encrypted': True,'data': encrypted_data.hex(),'signature': signature}
-            json_str = json.dumps(secure_wrapper)
-        else:
-            json_str = json.dumps(message_dict)
-        return json_str.encode(self.encoding)
+            return codec.encode(secure_wrapper)
+        return codec.encode_message(message_dict)
 
-    def _unpack(self, data: bytes) -> ChordMessage:
-        json_str = data.decode(self.encoding)
-        received_dict = json.loads(json_str)
+    def _unpack(self, data: bytes, session: Optional[ProtocolSession] = None) -> ChordMessage:
+        session = session or self.default_session
+        codec = session.codec
+        if session.cipher:
+            return ChordMessage(**codec.decode_message(session.cipher.open(data)))
+        if session.sealed:
+            return ChordMessage(**codec.decode_message(self.security.open_frame(data)))
+        received_dict = codec.decode_message(data)
         if self.enable_encryption and self.security:
             if received_dict.get('encrypted'):
-                encrypted_data = bytes.fromhex(received_dict['data'])
+                encrypted_data = received_dict['data']
                 signature = received_dict['signature']
                 try:
-                    message_dict = self.security.decrypt_message(encrypted_data, signature)
+                    if codec.supports_bytes:
+                        message_dict = codec.decode_message(self.security.decrypt_frame(encrypted_data, signature))
+                    else:
+                        message_dict = self.security.decrypt_message(bytes.fromhex(encrypted_data), signature)
                 except ValueError as e:
                     logger.error(f"Message not valid: {e}")
                     raise
@@ -60,29 +109,88 @@ class MessageProtocol:
             message_dict = received_dict
         return ChordMessage(**message_dict)
 
-    async def send_message(self, writer: asyncio.StreamWriter, message: ChordMessage) -> None:
+    def hello_payload(self, client_nonce: Optional[bytes] = None) -> Dict[str, Any]:
+        payload = {'codecs': list(self.codecs), 'sealed': self.sealed_frames}
+        if client_nonce is not None:
+            payload['ciphers'] = list(self.session_ciphers)
+            payload['nonce'] = client_nonce.hex()
+        return payload
+
+    def negotiate(self, hello_payload: Dict[str, Any]) -> Tuple[Dict[str, Any], ProtocolSession]:
+        offered = hello_payload.get('codecs') or []
+        chosen = next((name for name in offered if name in self.codecs), self.default_codec.name)
+        sealed = self.sealed_frames and bool(hello_payload.get('sealed'))
+        response = {'codec': chosen, 'sealed': sealed}
+        session = ProtocolSession(self._codec_for(chosen), sealed)
+        cipher_name = next((name for name in hello_payload.get('ciphers') or [] if name in self.session_ciphers), None)
+        if cipher_name and hello_payload.get('nonce'):
+            server_nonce = self.security.new_session_nonce()
+            session.cipher = self.security.derive_session(cipher_name, bytes.fromhex(hello_payload['nonce']), server_nonce, is_client=False)
+            if session.cipher:
+                response['cipher'] = cipher_name
+                response['nonce'] = server_nonce.hex()
+        return response, session
+
+    def accept_negotiation(self, response_payload: Optional[Dict[str, Any]], client_nonce: Optional[bytes] = None) -> ProtocolSession:
+        if not response_payload or response_payload.get('codec') not in self.codecs:
+            return self.default_session
+        sealed = self.sealed_frames and bool(response_payload.get('sealed'))
+        session = ProtocolSession(self._codec_for(response_payload['codec']), sealed)
+        cipher_name = response_payload.get('cipher')
+        if client_nonce is not None and cipher_name in self.session_ciphers and response_payload.get('nonce'):
+            session.cipher = self.security.derive_session(cipher_name, client_nonce, bytes.fromhex(response_payload['nonce']), is_client=True)
+            if session.cipher is None:
+                raise ValueError(f"Unable to derive session keys for cipher '{cipher_name}'")
+        return session
+
+    async def client_handshake(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, timeout: float) -> ProtocolSession:
+        if self.codecs == [self.default_codec.name] and not self.sealed_frames and not self.session_ciphers:
+            return self.default_session
+        client_nonce = self.security.new_session_nonce() if self.session_ciphers else None
+        hello = ChordMessage(type="HELLO", payload=self.hello_payload(client_nonce), sender_ip="0.0.0.0", sender_port=0)
+        await self.send_message(writer, hello)
+        response = await asyncio.wait_for(self.read_message(reader), timeout=timeout)
+        if response is None:
+            raise ConnectionResetError("Connection closed during protocol negotiation")
+        session = self.accept_negotiation(response.payload, client_nonce)
+        logger.debug(f"Negotiated codec '{session.codec.name}' (sealed frames: {session.sealed}, "
+                     f"session cipher: {session.cipher.algorithm if session.cipher else None})")
+        return session
+
+    def _codec_for(self, name: str) -> Codec:
+        if name == self.default_codec.name:
+            return self.default_codec
+        return get_codec(name)
+
+    async def send_message(self, writer: asyncio.StreamWriter, message: ChordMessage, session: Optional[ProtocolSession] = None) -> None:
         try:
-            body_bytes = self._pack(message)
+            body_bytes = self._pack(message, session)
             length = len(body_bytes)
             header = struct.pack('!I', length)
             writer.write(header + body_bytes)
             await writer.drain()
-            logger.debug(f"Message sent {message.type} ({length} bytes)")
+            logger.debug(f"Message sent {message.type}#{message.request_id} ({length} bytes)")
+        except ConnectionError as e:
+            logger.debug(f"Peer disconnected while sending {message.type}#{message.request_id}: {e}")
+            raise
         except Exception as e:
             logger.error(f"Error sending message: {e}")
             raise
 
-    async def read_message(self, reader: asyncio.StreamReader) -> Optional[ChordMessage]:
+    async def read_message(self, reader: asyncio.StreamReader, session: Optional[ProtocolSession] = None) -> Optional[ChordMessage]:
         try:
             header = await reader.readexactly(4)
             length = struct.unpack('!I', header)[0]
             body_bytes = await reader.readexactly(length)
-            message = self._unpack(body_bytes)
-            logger.debug(f"Message received {message.type}")
+            message = self._unpack(body_bytes, session)
+            logger.debug(f"Message received {message.type}#{message.request_id}")
             return message
         except asyncio.IncompleteReadError:
             logger.debug("Connessione chiusa dal peer")
             return None
+        except ConnectionError as e:
+            logger.debug(f"Connessione chiusa dal peer: {e}")
+            return None
         except ValueError as e:
             logger.error(f"Connection closed by peer: {e}")
             return None
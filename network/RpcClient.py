@@ -1,48 +1,74 @@
 import asyncio
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
 from .MessageProtocol import MessageProtocol, ChordMessage
+from .ConnectionPool import ConnectionPool
+from fault_tolerance.LivenessTracker import LivenessTracker
 from config.LoggingConfig import get_logger
 from config.Settings import NetworkSettings, SecuritySettings
 
 logger = get_logger("RPCClient")
 
+IDEMPOTENT_COMMANDS = frozenset({
+    'FIND_SUCCESSOR', 'GET_PREDECESSOR', 'GET_SUCCESSOR', 'GET_SUCCESSOR_LIST', 'CLOSEST_PRECEDING_NODE', 'GET_FINGERS',
+    'NOTIFY', 'GET_KEY', 'MULTI_GET', 'INVALIDATE_KEYS', 'GET_KEYS_IN_RANGE', 'FETCH_KEYS', 'TRANSFER_RANGE',
+    'COMMIT_TRANSFER', 'PING', 'GET_STATUS',
+})
+
 
 class RPCClient:
 
-    def __init__(self, local_ip: str = "0.0.0.0", local_port: int = 0):
+    _shared: Dict[Tuple[str, int], 'RPCClient'] = {}
+
+    def __init__(self, local_ip: str = "0.0.0.0", local_port: int = 0, pool: Optional[ConnectionPool] = None):
         self.local_ip = local_ip
         self.local_port = local_port
+        self._pool = pool
         encryption_key = SecuritySettings.SECRET_KEY if SecuritySettings.ENCRYPTION_ENABLED else None
-        self.protocol = MessageProtocol(encryption_key=encryption_key)
+        self.protocol = MessageProtocol.shared(encryption_key)
+
+    @classmethod
+    def shared(cls, local_ip: str = "0.0.0.0", local_port: int = 0) -> 'RPCClient':
+        client = cls._shared.get((local_ip, local_port))
+        if client is None:
+            client = cls(local_ip, local_port)
+            cls._shared[(local_ip, local_port)] = client
+        return client
+
+    @property
+    def pool(self) -> ConnectionPool:
+        return self._pool if self._pool is not None else ConnectionPool.for_running_loop()
 
     async def send_request(self, target_ip: str, target_port: int, method: str, payload: Optional[Dict[str, Any]] = None, timeout: float = NetworkSettings.TIMEOUT) -> Optional[Dict[str, Any]]:
         if payload is None:
             payload = {}
-        writer = None
-        try:
-            reader, writer = await asyncio.wait_for(asyncio.open_connection(target_ip, target_port), timeout=timeout)
-            message = ChordMessage(type=method, payload=payload, sender_ip=self.local_ip, sender_port=self.local_port)
-            await self.protocol.send_message(writer, message)
-            response = await asyncio.wait_for(self.protocol.read_message(reader), timeout=timeout)
-            if response:
+        message = ChordMessage(type=method, payload=payload, sender_ip=self.local_ip, sender_port=self.local_port)
+        pool = self.pool
+        liveness = LivenessTracker.shared()
+        retried = False
+        while True:
+            conn = None
+            try:
+                conn = await pool.acquire(target_ip, target_port, timeout, self.protocol)
+                reused = conn.requests_started > 0
+                written = conn.requests_written
+                response = await conn.request(message, timeout)
+                liveness.record_success(target_ip, target_port)
                 return response.payload
+            except asyncio.TimeoutError:
+                logger.warning(f"Connection timeout to {target_ip}:{target_port}")
+            except ConnectionRefusedError:
+                logger.warning(f"Refused connection by {target_ip}:{target_port}")
+            except (ConnectionResetError, BrokenPipeError) as e:
+                replayable = method in IDEMPOTENT_COMMANDS or (conn is not None and conn.requests_written == written)
+                if conn and reused and replayable and not retried:
+                    logger.debug(f"Stale pooled connection to {target_ip}:{target_port}, reconnecting")
+                    retried = True
+                    continue
+                logger.error(f"RPC error to {target_ip}:{target_port}: {e}")
+            except Exception as e:
+                logger.error(f"RPC error to {target_ip}:{target_port}: {e}")
+            liveness.record_failure(target_ip, target_port)
             return None
-        except asyncio.TimeoutError:
-            logger.warning(f"Connection timeout to {target_ip}:{target_port}")
-            return None
-        except ConnectionRefusedError:
-            logger.warning(f"Refused connection by {target_ip}:{target_port}")
-            return None
-        except Exception as e:
-            logger.error(f"RPC error to {target_ip}:{target_port}: {e}")
-            return None
-        finally:
-            if writer:
-                try:
-                    writer.close()
-                    await writer.wait_closed()
-                except (OSError, asyncio.TimeoutError):
-                    pass
 
     async def ping(self, target_ip: str, target_port: int, timeout: float = 1.0) -> bool:
         result = await self.send_request(target_ip, target_port, "PING", {}, timeout=timeout)
@@ -1,9 +1,12 @@
 import asyncio
-from typing import Optional
+import time
+from typing import Optional, Set
 from core.ChordNode import ChordNode
 from core.NodeRef import RemoteNode
-from network.MessageProtocol import MessageProtocol, ChordMessage
+from utils.ChordMath import ChordMath
+from network.MessageProtocol import MessageProtocol, ChordMessage, ProtocolSession
 from config.LoggingConfig import get_logger
+from config.Settings import ChordSettings, NetworkSettings
 
 logger = get_logger("SocketServer")
 
@@ -15,12 +18,15 @@ class SocketServer:
         self._protocol = protocol
         self._node: Optional[ChordNode] = None
         self._server: Optional[asyncio.Server] = None
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._handlers: Set[asyncio.Task] = set()
+        self._requests: Set[asyncio.Task] = set()
 
     def set_node(self, node: ChordNode) -> None:
         self._node = node
 
     async def start(self) -> None:
-        self._server = await asyncio.start_server(self._handle_client,self.host,self.port)
+        self._server = await asyncio.start_server(self._accept_client,self.host,self.port)
         logger.info(f"Chord Server listening at {self.host}:{self.port}")
         async with self._server:
             await self._server.serve_forever()
@@ -28,25 +34,77 @@ class SocketServer:
     async def stop(self) -> None:
         if self._server:
             self._server.close()
+            for task in list(self._requests) + list(self._handlers):
+                task.cancel()
+            await asyncio.gather(*self._requests, *self._handlers, return_exceptions=True)
+            for writer in list(self._connections):
+                writer.close()
             await self._server.wait_closed()
             logger.info("Server stopped")
 
+    def _accept_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        handler = asyncio.create_task(self._handle_client(reader, writer))
+        self._handlers.add(handler)
+        handler.add_done_callback(self._handlers.discard)
+
     async def _handle_client(self,reader: asyncio.StreamReader,writer: asyncio.StreamWriter) -> None:
+        self._connections.add(writer)
+        write_lock = asyncio.Lock()
+        slots = asyncio.Semaphore(NetworkSettings.SERVER_MAX_CONCURRENT_REQUESTS)
+        in_flight: Set[asyncio.Task] = set()
+        session: Optional[ProtocolSession] = None
         try:
-            request = await self._protocol.read_message(reader)
-            if request:
-                response_payload = await self._dispatch_request(request)
-                response = ChordMessage(type=f"{request.type}_RESPONSE",payload=response_payload,sender_ip=self.host,sender_port=self.port)
-                await self._protocol.send_message(writer, response)
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._protocol.read_message(reader, session), timeout=NetworkSettings.SERVER_IDLE_TIMEOUT)
+                except asyncio.TimeoutError:
+                    if in_flight:
+                        continue
+                    logger.debug("Closing idle client connection")
+                    break
+                if not request:
+                    break
+                if request.type == "HELLO" and session is None and not in_flight:
+                    response_payload, session = self._protocol.negotiate(request.payload)
+                    response = ChordMessage(type="HELLO_RESPONSE",payload=response_payload,sender_ip=self.host,sender_port=self.port,request_id=request.request_id)
+                    await self._protocol.send_message(writer, response)
+                    continue
+                await slots.acquire()
+                task = asyncio.create_task(self._serve_request(request, writer, write_lock, session))
+                in_flight.add(task)
+                self._requests.add(task)
+                task.add_done_callback(in_flight.discard)
+                task.add_done_callback(self._requests.discard)
+                task.add_done_callback(lambda _: slots.release())
+        except asyncio.CancelledError:
+            for task in in_flight:
+                task.cancel()
+            raise
+        except ConnectionError as e:
+            logger.debug(f"Client disconnected: {e}")
         except Exception as e:
             logger.error(f"Error in client management: {e}")
         finally:
+            if in_flight:
+                await asyncio.gather(*in_flight, return_exceptions=True)
+            self._connections.discard(writer)
             try:
                 writer.close()
                 await writer.wait_closed()
-            except(OSError, asyncio.TimeoutError):
+            except(OSError, asyncio.TimeoutError, asyncio.CancelledError):
                 pass
 
+    async def _serve_request(self, request: ChordMessage, writer: asyncio.StreamWriter, write_lock: asyncio.Lock, session: Optional[ProtocolSession]) -> None:
+        try:
+            response_payload = await self._dispatch_request(request)
+            response = ChordMessage(type=f"{request.type}_RESPONSE",payload=response_payload,sender_ip=self.host,sender_port=self.port,request_id=request.request_id)
+            async with write_lock:
+                await self._protocol.send_message(writer, response, session)
+        except ConnectionError as e:
+            logger.debug(f"Client disconnected before {request.type}#{request.request_id} was answered: {e}")
+        except Exception as e:
+            logger.error(f"Error in client management: {e}")
+
     async def _dispatch_request(self, request: ChordMessage) -> dict:
         cmd = request.type
         payload = request.payload
@@ -65,44 +123,111 @@ class SocketServer:
                 successor = await self._node.topology_manager.get_successor()
                 return successor.as_dict() if successor else {'id': None}
 
+            elif cmd == "GET_SUCCESSOR_LIST":
+                topology = self._node.topology_manager
+                nodes = topology.successor_list
+                if not nodes and topology.successor and topology.successor.id != self._node.id:
+                    nodes = [topology.successor]
+                return {'nodes': [node.as_dict() for node in nodes]}
+
             elif cmd == "CLOSEST_PRECEDING_NODE":
                 node = await self._node.topology_manager.closest_preceding_node(payload['id'])
                 return node.as_dict() if node else {'id': None}
 
+            elif cmd == "GET_FINGERS":
+                nodes = [finger.as_dict() for finger in self._node.finger_table.distinct_nodes()]
+                successor = self._node.topology_manager.successor
+                if successor is not None:
+                    nodes.append(successor.as_dict())
+                return {'nodes': nodes}
+
             elif cmd == "NOTIFY":
-                notifier = RemoteNode(payload['id'], payload['ip'], payload['port'], self.host, self.port)
+                notifier = RemoteNode.shared(payload['id'], payload['ip'], payload['port'], self.host, self.port)
                 await self._node.topology_manager.notify(notifier)
                 return {'status': 'ok'}
 
             elif cmd == "STORE_KEY":
                 if 'key' not in payload or 'value' not in payload:
                     return {'error': 'missing_key_or_value'}
-                result = await self._node.store(payload['key'], payload['value'])
+                if payload.get('direct'):
+                    if not self._node.topology_manager.owns(ChordMath.compute_hash(payload['key'])):
+                        return {'status': 'not_owner'}
+                    result = await self._node.store_owned(payload['key'], payload['value'], payload.get('expires_at'), payload.get('version'))
+                else:
+                    result = await self._node.store(payload['key'], payload['value'], use_cache=not payload.get('routed'),
+                                                    ttl=payload.get('ttl'), expires_at=payload.get('expires_at'), version=payload.get('version'))
                 return {'status': 'ok' if result else 'error'}
 
             elif cmd == "STORE_REPLICA":
                 if 'key' not in payload or 'value' not in payload:
                     return {'error': 'missing_key_or_value'}
-                result = await self._node.store_replica(payload['key'], payload['value'])
+                result = await self._node.store_replica(payload['key'], payload['value'], payload.get('expires_at'), payload.get('version'))
                 return {'status': 'ok' if result else 'error'}
 
+            elif cmd == "STORE_REPLICAS":
+                if 'data' not in payload:
+                    return {'error': 'missing_data'}
+                result = await self._node.store_replicas(payload['data'], payload.get('expires'), payload.get('versions'))
+                return {'status': 'ok' if result else 'error'}
+
+            elif cmd == "MULTI_STORE":
+                if 'data' not in payload:
+                    return {'error': 'missing_data'}
+                expires = payload.get('expires')
+                if payload.get('ttl') is not None:
+                    expires = dict.fromkeys(payload['data'], time.time() + payload['ttl'])
+                return {'results': await self._node.multi_store(payload['data'], use_cache=not payload.get('routed'), expires=expires,
+                                                                versions=payload.get('versions'))}
+
+            elif cmd == "MULTI_GET":
+                if 'keys' not in payload:
+                    return {'error': 'missing_keys'}
+                return {'values': await self._node.multi_get(payload['keys'], use_cache=not payload.get('routed'))}
+
             elif cmd == "GET_KEY":
                 if 'key' not in payload:
                     return {'error': 'missing_key'}
+                if payload.get('local'):
+                    return {'value': self._node.data_store.get(payload['key'])}
+                reader = payload.get('reader')
+                if reader is not None:
+                    value, version = self._node.serve_read(payload['key'], (reader['id'], reader['ip'], reader['port']))
+                    if value is not None:
+                        return {'value': value, 'version': version}
                 val = await self._node.get(payload['key'])
                 return {'value': val}
 
+            elif cmd == "INVALIDATE_KEYS":
+                if 'keys' not in payload:
+                    return {'error': 'missing_keys'}
+                self._node.invalidate_cached(payload['keys'])
+                return {'status': 'ok'}
+
             elif cmd == "GET_KEYS_IN_RANGE":
                 keys = self._node.data_transfer_manager.get_keys_in_range_local(payload['start'], payload['end'])
                 return {'keys': keys}
 
             elif cmd == "TRANSFER_KEYS":
-                data = self._node.data_transfer_manager.transfer_keys_local(payload['keys'])
-                return {'data': data}
+                return self._node.data_transfer_manager.transfer_keys_local(payload['keys'])
+
+            elif cmd == "FETCH_KEYS":
+                return self._node.data_transfer_manager.fetch_keys_local(payload['keys'])
+
+            elif cmd == "TRANSFER_RANGE":
+                return self._node.data_transfer_manager.transfer_range_local(
+                    payload['transfer_id'], payload['start'], payload['end'], payload.get('after'),
+                    payload.get('limit', ChordSettings.TRANSFER_BATCH_SIZE), payload.get('max_bytes', ChordSettings.TRANSFER_BATCH_BYTES),
+                    payload.get('digest', False)
+                )
+
+            elif cmd == "COMMIT_TRANSFER":
+                return self._node.data_transfer_manager.commit_transfer_local(
+                    payload['transfer_id'], payload['start'], payload['end'], payload.get('upto')
+                )
 
             elif cmd == "RECEIVE_KEYS":
-                for key, value in payload['data'].items():
-                    await self._node.store(key, value)
+                await self._node.multi_store(payload['data'], use_cache=not payload.get('routed'), expires=payload.get('expires'),
+                                             versions=payload.get('versions'))
                 return {'status': 'ok'}
 
             elif cmd == "PING":
@@ -1,4 +1,4 @@
-__all__ = ['MessageProtocol', 'ChordMessage', 'RPCClient', 'SocketServer']
+__all__ = ['MessageProtocol', 'ChordMessage', 'JsonCodec', 'BinaryCodec', 'RPCClient', 'ConnectionPool', 'SocketServer']
 
 def __getattr__(name):
     if name == 'MessageProtocol':
@@ -7,9 +7,15 @@ def __getattr__(name):
     elif name == 'ChordMessage':
         from .MessageProtocol import ChordMessage
         return ChordMessage
+    elif name in ('JsonCodec', 'BinaryCodec'):
+        from . import Codec as codec_module
+        return getattr(codec_module, name)
     elif name == 'RPCClient':
         from .RpcClient import RPCClient
         return RPCClient
+    elif name == 'ConnectionPool':
+        from .ConnectionPool import ConnectionPool
+        return ConnectionPool
     elif name == 'SocketServer':
         from .SocketServer import SocketServer
         return SocketServer
@@ -1,13 +1,53 @@
 import hmac
 import hashlib
 import json
+import os
 from base64 import urlsafe_b64encode
+from cryptography.exceptions import InvalidTag
 from cryptography.fernet import Fernet
-from typing import Dict, Any, Tuple
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM, ChaCha20Poly1305
+from cryptography.hazmat.primitives.kdf.hkdf import HKDF
+from typing import Dict, Any, Tuple, Optional
 from config.LoggingConfig import get_logger
 
 logger = get_logger("MessageSecurity")
 
+FRAME_NONCE_SIZE = 12
+FRAME_TAG_SIZE = 16
+SESSION_NONCE_SIZE = 16
+
+SESSION_CIPHERS = {
+    'chacha20-poly1305': ChaCha20Poly1305,
+    'aes-gcm': AESGCM,
+}
+
+
+class SessionCipher:
+
+    def __init__(self, algorithm: str, send_key: bytes, receive_key: bytes):
+        aead = SESSION_CIPHERS[algorithm]
+        self.algorithm = algorithm
+        self._send_cipher = aead(send_key)
+        self._receive_cipher = aead(receive_key)
+        self._send_counter = 0
+        self._receive_counter = 0
+
+    def seal(self, data: bytes) -> bytes:
+        nonce = self._send_counter.to_bytes(FRAME_NONCE_SIZE, 'big')
+        self._send_counter += 1
+        return self._send_cipher.encrypt(nonce, data, None)
+
+    def open(self, frame: bytes) -> bytes:
+        nonce = self._receive_counter.to_bytes(FRAME_NONCE_SIZE, 'big')
+        try:
+            data = self._receive_cipher.decrypt(nonce, frame, None)
+        except InvalidTag:
+            logger.warning(f"Session frame {self._receive_counter} authentication failed!")
+            raise ValueError("Session frame authentication failed")
+        self._receive_counter += 1
+        return data
+
 
 class MessageSecurity:
 
@@ -16,6 +56,8 @@ class MessageSecurity:
         key_material = hashlib.sha256(self.secret_key).digest()
         fernet_key = urlsafe_b64encode(key_material)
         self.cipher = Fernet(fernet_key)
+        frame_key = HKDF(algorithm=hashes.SHA256(), length=32, salt=None, info=b'chord-dht sealed frame').derive(self.secret_key)
+        self.frame_cipher = AESGCM(frame_key)
 
     def sign_message(self, message_dict: dict) -> str:
         msg_str = json.dumps(message_dict, sort_keys=True)
@@ -47,4 +89,48 @@ class MessageSecurity:
             return message_dict
         except Exception as e:
             logger.error(f"Error during decryption: {e}")
-            raise ValueError(f"Unable to decrypt message: {e}")
\ No newline at end of file
+            raise ValueError(f"Unable to decrypt message: {e}")
+
+    def encrypt_frame(self, data: bytes) -> Tuple[bytes, str]:
+        encrypted = self.cipher.encrypt(data)
+        signature = hmac.new(self.secret_key, data, hashlib.sha256).hexdigest()
+        logger.debug(f"Encrypted frame : {len(encrypted)} bytes")
+        return encrypted, signature
+
+    def decrypt_frame(self, encrypted_data: bytes, signature: str) -> bytes:
+        try:
+            decrypted = self.cipher.decrypt(encrypted_data)
+        except Exception as e:
+            logger.error(f"Error during decryption: {e}")
+            raise ValueError(f"Unable to decrypt frame: {e}")
+        expected = hmac.new(self.secret_key, decrypted, hashlib.sha256).hexdigest()
+        if not isinstance(signature, str) or not hmac.compare_digest(expected, signature):
+            logger.warning("Signature Not Valid!")
+            raise ValueError("Signature Not Valid!")
+        return decrypted
+
+    def seal_frame(self, data: bytes) -> bytes:
+        nonce = os.urandom(FRAME_NONCE_SIZE)
+        return nonce + self.frame_cipher.encrypt(nonce, data, None)
+
+    def open_frame(self, frame: bytes) -> bytes:
+        if len(frame) < FRAME_NONCE_SIZE + FRAME_TAG_SIZE:
+            raise ValueError("Sealed frame too short")
+        try:
+            return self.frame_cipher.decrypt(frame[:FRAME_NONCE_SIZE], frame[FRAME_NONCE_SIZE:], None)
+        except InvalidTag:
+            logger.warning("Sealed frame authentication failed!")
+            raise ValueError("Sealed frame authentication failed")
+
+    def new_session_nonce(self) -> bytes:
+        return os.urandom(SESSION_NONCE_SIZE)
+
+    def derive_session(self, algorithm: str, client_nonce: bytes, server_nonce: bytes, is_client: bool) -> Optional[SessionCipher]:
+        if algorithm not in SESSION_CIPHERS or len(client_nonce) != SESSION_NONCE_SIZE or len(server_nonce) != SESSION_NONCE_SIZE:
+            return None
+        info = b'chord-dht session ' + algorithm.encode('utf-8')
+        key_material = HKDF(algorithm=hashes.SHA256(), length=64, salt=client_nonce + server_nonce, info=info).derive(self.secret_key)
+        client_key, server_key = key_material[:32], key_material[32:]
+        if is_client:
+            return SessionCipher(algorithm, client_key, server_key)
+        return SessionCipher(algorithm, server_key, client_key)
@@ -0,0 +1,253 @@
+import heapq
+import mmap
+import os
+import shutil
+import struct
+from typing import Any, Dict, Iterator, List, MutableMapping, Optional, Set, Tuple
+from network.Codec import get_codec
+from utils.ChordMath import ChordMath
+
+SNAPSHOT_MAGIC = b'CHORDMP2'
+SNAPSHOT_HEADER = struct.Struct('<8sQQQQ')
+INDEX_ENTRY = struct.Struct('>32sQIIQ')
+HASH_BYTES = 32
+
+_codec = get_codec('binary')
+
+
+def hash_bytes(key_hash: int) -> bytes:
+    return key_hash.to_bytes(HASH_BYTES, 'big')
+
+
+class MappedSnapshot:
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, 'rb')
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count, self.first_segment, self._index_offset, self.max_version = SNAPSHOT_HEADER.unpack_from(self._map, 0)
+        if magic != SNAPSHOT_MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a mapped snapshot")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __contains__(self, key: str) -> bool:
+        return self._find(key) >= 0
+
+    def get(self, key: str) -> Optional[Any]:
+        raw_value = self.get_raw(key)
+        return None if raw_value is None else _codec.decode(raw_value)
+
+    def get_raw(self, key: str) -> Optional[bytes]:
+        position = self._find(key)
+        if position < 0:
+            return None
+        _, offset, key_length, value_length, _ = self._entry(position)
+        start = offset + key_length
+        return self._map[start:start + value_length]
+
+    def version(self, key: str) -> Optional[int]:
+        position = self._find(key)
+        if position < 0:
+            return None
+        return self._entry(position)[4]
+
+    def irange(self, low: int, high: int) -> Iterator[Tuple[int, str]]:
+        position = self._upper_bound(hash_bytes(low)) if low >= 0 else 0
+        high_bytes = hash_bytes(high)
+        while position < self.count:
+            digest, offset, key_length, _, _ = self._entry(position)
+            if digest > high_bytes:
+                return
+            yield int.from_bytes(digest, 'big'), self._map[offset:offset + key_length].decode()
+            position += 1
+
+    def __iter__(self) -> Iterator[str]:
+        for position in range(self.count):
+            _, offset, key_length, _, _ = self._entry(position)
+            yield self._map[offset:offset + key_length].decode()
+
+    def entries(self) -> Iterator[Tuple[bytes, str, bytes, int]]:
+        for position in range(self.count):
+            digest, offset, key_length, value_length, version = self._entry(position)
+            key = self._map[offset:offset + key_length].decode()
+            yield digest, key, self._map[offset + key_length:offset + key_length + value_length], version
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def _entry(self, position: int) -> Tuple[bytes, int, int, int, int]:
+        return INDEX_ENTRY.unpack_from(self._map, self._index_offset + position * INDEX_ENTRY.size)
+
+    def _hash_at(self, position: int) -> bytes:
+        start = self._index_offset + position * INDEX_ENTRY.size
+        return self._map[start:start + HASH_BYTES]
+
+    def _lower_bound(self, digest: bytes) -> int:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._hash_at(middle) < digest:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _upper_bound(self, digest: bytes) -> int:
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._hash_at(middle) <= digest:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _find(self, key: str) -> int:
+        digest = hash_bytes(ChordMath.compute_hash(key))
+        encoded = key.encode()
+        position = self._lower_bound(digest)
+        while position < self.count:
+            entry_digest, offset, key_length, _, _ = self._entry(position)
+            if entry_digest != digest:
+                return -1
+            if self._map[offset:offset + key_length] == encoded:
+                return position
+            position += 1
+        return -1
+
+
+def write_snapshot(path: str, base: Optional[MappedSnapshot], overlay: Dict[str, Any], deleted: Set[str], first_segment: int,
+                   raw: bool = False, versions: Optional[Dict[str, int]] = None) -> int:
+    def base_entries() -> Iterator[Tuple[bytes, bytes, bytes, int]]:
+        if base is None:
+            return
+        for digest, key, raw_value, version in base.entries():
+            if key not in overlay and key not in deleted:
+                yield digest, key.encode(), raw_value, version
+
+    versions = versions or {}
+    fresh = sorted((hash_bytes(ChordMath.compute_hash(key)), key.encode(), value if raw else _codec.encode(value), versions.get(key, 0))
+                   for key, value in overlay.items())
+    temp_path = path + '.tmp'
+    index_path = path + '.idx'
+    count = 0
+    max_version = 0
+    with open(temp_path, 'wb') as f, open(index_path, 'w+b') as index:
+        f.write(b'\0' * SNAPSHOT_HEADER.size)
+        offset = SNAPSHOT_HEADER.size
+        for digest, key, raw_value, version in heapq.merge(base_entries(), fresh):
+            f.write(key)
+            f.write(raw_value)
+            index.write(INDEX_ENTRY.pack(digest, offset, len(key), len(raw_value), version))
+            offset += len(key) + len(raw_value)
+            count += 1
+            max_version = max(max_version, version)
+        index.seek(0)
+        shutil.copyfileobj(index, f)
+        f.seek(0)
+        f.write(SNAPSHOT_HEADER.pack(SNAPSHOT_MAGIC, count, first_segment, offset, max_version))
+        f.flush()
+        os.fsync(f.fileno())
+    os.remove(index_path)
+    os.replace(temp_path, path)
+    return count
+
+
+class SnapshotOverlay(MutableMapping):
+
+    def __init__(self, base: Optional[MappedSnapshot] = None, raw: bool = False):
+        self.base = base
+        self.raw = raw
+        self.overlay: Dict[str, Any] = {}
+        self.deleted: Set[str] = set()
+        self._size = len(base) if base is not None else 0
+
+    def _in_base(self, key: str) -> bool:
+        return self.base is not None and key not in self.deleted and key in self.base
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.overlay:
+            return self.overlay[key]
+        if self.base is None or key in self.deleted:
+            raise KeyError(key)
+        value = self._base_get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key in self.overlay:
+            return self.overlay[key]
+        if self.base is None or key in self.deleted:
+            return default
+        value = self._base_get(key)
+        return default if value is None else value
+
+    def _base_get(self, key: str) -> Optional[Any]:
+        return self.base.get_raw(key) if self.raw else self.base.get(key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.overlay or self._in_base(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in self.overlay:
+            if key in self.deleted:
+                self.deleted.discard(key)
+                self._size += 1
+            elif self.base is None or key not in self.base:
+                self._size += 1
+        self.overlay[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key in self.overlay:
+            del self.overlay[key]
+            if self.base is not None and key in self.base:
+                self.deleted.add(key)
+        elif self._in_base(key):
+            self.deleted.add(key)
+        else:
+            raise KeyError(key)
+        self._size -= 1
+
+    def __iter__(self) -> Iterator[str]:
+        yield from list(self.overlay)
+        if self.base is not None:
+            for key in self.base:
+                if key not in self.overlay and key not in self.deleted:
+                    yield key
+
+    def __len__(self) -> int:
+        return self._size
+
+    def copy(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+    def base_irange(self, low: int, high: int) -> Iterator[Tuple[int, str]]:
+        if self.base is None:
+            return
+        for key_hash, key in self.base.irange(low, high):
+            if key not in self.overlay and key not in self.deleted:
+                yield key_hash, key
+
+    def capture(self) -> Tuple[Dict[str, Any], Set[str]]:
+        return dict(self.overlay), set(self.deleted)
+
+    def rebase(self, base: MappedSnapshot, overlay: Dict[str, Any], deleted: Set[str]) -> List[str]:
+        released = []
+        for key, value in overlay.items():
+            if key not in self.overlay:
+                self.deleted.add(key)
+            elif self.overlay[key] is value:
+                del self.overlay[key]
+                released.append(key)
+        previous, self.base = self.base, base
+        self.deleted = {key for key in self.deleted if key in base}
+        self._size = len(base) + sum(1 for key in self.overlay if key not in base) - len(self.deleted)
+        if previous is not None and previous is not base:
+            previous.close()
+        return released
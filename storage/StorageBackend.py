@@ -0,0 +1,61 @@
+import os
+from typing import Any, Dict, Optional, Set, Tuple, TYPE_CHECKING
+from config.Settings import StorageSettings
+
+if TYPE_CHECKING:
+    from .MappedSnapshot import MappedSnapshot, SnapshotOverlay
+
+STORAGE_BACKENDS = ('memory', 'wal')
+TOMBSTONE = object()
+
+
+class RecoveredState:
+
+    def __init__(self, base: Optional['MappedSnapshot'] = None, records: Optional[Dict[str, Any]] = None,
+                 expirations: Optional[Dict[str, float]] = None, versions: Optional[Dict[str, int]] = None):
+        self.base = base
+        self.records = records if records is not None else {}
+        self.expirations = expirations if expirations is not None else {}
+        self.versions = versions if versions is not None else {}
+
+
+class StorageBackend:
+
+    name = 'memory'
+    durable = False
+
+    def recover(self) -> RecoveredState:
+        return RecoveredState()
+
+    def append_put(self, key: str, value: Any, expires_at: Optional[float] = None, version: Optional[int] = None) -> None:
+        pass
+
+    def append_delete(self, key: str) -> None:
+        pass
+
+    async def sync(self) -> None:
+        pass
+
+    async def checkpoint(self, data: 'SnapshotOverlay', force: bool = False, expirations: Optional[Dict[str, float]] = None,
+                         versions: Optional[Dict[str, int]] = None) -> Optional[Tuple['MappedSnapshot', Dict[str, Any], Set[str]]]:
+        return None
+
+    def close(self) -> None:
+        pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {'backend': self.name}
+
+
+class MemoryBackend(StorageBackend):
+    pass
+
+
+def create_backend(kind: Optional[str], node_name: str, data_dir: Optional[str] = None) -> StorageBackend:
+    kind = kind or StorageSettings.BACKEND
+    if kind == 'memory':
+        return MemoryBackend()
+    if kind == 'wal':
+        from .WalBackend import WalBackend
+        return WalBackend(os.path.join(data_dir or StorageSettings.DATA_DIR, node_name))
+    raise ValueError(f"Unknown storage backend: {kind}")
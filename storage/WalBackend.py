@@ -0,0 +1,210 @@
+import asyncio
+import os
+import struct
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Set, Tuple
+from config.LoggingConfig import get_logger
+from config.Settings import StorageSettings
+from network.Codec import get_codec
+from .MappedSnapshot import MappedSnapshot, SnapshotOverlay, write_snapshot
+from .StorageBackend import RecoveredState, StorageBackend, TOMBSTONE
+
+logger = get_logger("WalBackend")
+
+RECORD_HEADER = struct.Struct('<II')
+SNAPSHOT_FILE = 'snapshot.dat'
+SEGMENT_PREFIX = 'wal-'
+SEGMENT_SUFFIX = '.log'
+OP_PUT = 'p'
+OP_DELETE = 'd'
+OP_EXPIRE = 'e'
+
+
+class WalBackend(StorageBackend):
+
+    name = 'wal'
+    durable = True
+
+    def __init__(self, directory: str, fsync: bool = StorageSettings.WAL_FSYNC, group_commit_delay: float = StorageSettings.GROUP_COMMIT_DELAY,
+                 snapshot_min_bytes: int = StorageSettings.SNAPSHOT_MIN_WAL_BYTES):
+        self.directory = directory
+        self.fsync = fsync
+        self.group_commit_delay = group_commit_delay
+        self.snapshot_min_bytes = snapshot_min_bytes
+        self._codec = get_codec('binary')
+        self._segment = 0
+        self._file = None
+        self._appended = 0
+        self._synced = 0
+        self._log_bytes = 0
+        self._flush_task: Optional[asyncio.Future] = None
+        self._snapshot_lock = asyncio.Lock()
+        self.stats = {'appends': 0, 'syncs': 0, 'snapshots': 0, 'recovered_keys': 0, 'replayed_records': 0, 'recovery_time': 0.0}
+        os.makedirs(directory, exist_ok=True)
+
+    def recover(self) -> RecoveredState:
+        started = time.perf_counter()
+        base = self._open_snapshot()
+        first_segment = base.first_segment if base is not None else 0
+        records: Dict[str, Any] = {}
+        expirations: Dict[str, float] = {}
+        versions: Dict[str, int] = {}
+        segments = [segment for segment in self._segments() if segment >= first_segment]
+        for segment in segments:
+            self.stats['replayed_records'] += self._replay(segment, records, expirations, versions)
+        self._segment = max(segments[-1] + 1 if segments else first_segment, first_segment)
+        self._open_segment()
+        self.stats['recovered_keys'] = (len(base) if base is not None else 0) + len(records)
+        self.stats['recovery_time'] = round(time.perf_counter() - started, 4)
+        logger.info(f"Opened {self.directory}: {len(base) if base is not None else 0} mapped keys, "
+                    f"{self.stats['replayed_records']} WAL records replayed in {self.stats['recovery_time']}s")
+        return RecoveredState(base, records, expirations, versions)
+
+    def append_put(self, key: str, value: Any, expires_at: Optional[float] = None, version: Optional[int] = None) -> None:
+        if expires_at is None and version is None:
+            self._append([OP_PUT, key, value])
+        else:
+            self._append([OP_PUT, key, value, expires_at, version])
+
+    def append_delete(self, key: str) -> None:
+        self._append([OP_DELETE, key])
+
+    def _append(self, record: List[Any]) -> None:
+        if self._file is None:
+            self._open_segment()
+        payload = self._codec.encode(record)
+        self._file.write(RECORD_HEADER.pack(len(payload), zlib.crc32(payload)))
+        self._file.write(payload)
+        self._appended += 1
+        self._log_bytes += RECORD_HEADER.size + len(payload)
+        self.stats['appends'] += 1
+
+    async def sync(self) -> None:
+        target = self._appended
+        while self._synced < target and self._file is not None:
+            if self._flush_task is None or self._flush_task.done():
+                self._flush_task = asyncio.ensure_future(self._flush())
+            await asyncio.shield(self._flush_task)
+
+    async def _flush(self) -> None:
+        if self.group_commit_delay:
+            await asyncio.sleep(self.group_commit_delay)
+        if self._file is None:
+            return
+        upto = self._appended
+        self._file.flush()
+        if self.fsync:
+            await asyncio.get_running_loop().run_in_executor(None, os.fsync, self._file.fileno())
+        self._synced = max(self._synced, upto)
+        self.stats['syncs'] += 1
+
+    async def checkpoint(self, data: SnapshotOverlay, force: bool = False, expirations: Optional[Dict[str, float]] = None,
+                         versions: Optional[Dict[str, int]] = None) -> Optional[Tuple[MappedSnapshot, Dict[str, Any], Set[str]]]:
+        if not force and self._log_bytes < self.snapshot_min_bytes:
+            return None
+        async with self._snapshot_lock:
+            while self._flush_task is not None and not self._flush_task.done():
+                await asyncio.shield(self._flush_task)
+            base = data.base
+            overlay, deleted = data.capture()
+            deadlines = dict(expirations) if expirations else {}
+            overlay_versions = {key: versions[key] for key in overlay if key in versions} if versions else {}
+            first_segment = self._rotate()
+            for key, expires_at in deadlines.items():
+                self._append([OP_EXPIRE, key, expires_at])
+            started = time.perf_counter()
+            path = os.path.join(self.directory, SNAPSHOT_FILE)
+            count = await asyncio.get_running_loop().run_in_executor(None, self._write_snapshot, path, base, overlay, deleted,
+                                                                     first_segment, data.raw, overlay_versions)
+            for segment in self._segments():
+                if segment < first_segment:
+                    os.remove(self._segment_path(segment))
+            self.stats['snapshots'] += 1
+            logger.info(f"Snapshot of {count} keys written in {time.perf_counter() - started:.3f}s, WAL restarted at segment {first_segment}")
+            return MappedSnapshot(path), overlay, deleted
+
+    def _rotate(self) -> int:
+        old_file = self._file
+        self._segment += 1
+        self._open_segment()
+        if old_file is not None:
+            old_file.flush()
+            if self.fsync:
+                os.fsync(old_file.fileno())
+            old_file.close()
+        self._synced = self._appended
+        self._log_bytes = 0
+        return self._segment
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, backend=self.name, segment=self._segment, log_bytes=self._log_bytes, unsynced=self._appended - self._synced)
+
+    def _segment_path(self, segment: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{segment:08d}{SEGMENT_SUFFIX}")
+
+    def _segments(self) -> List[int]:
+        segments = []
+        for name in os.listdir(self.directory):
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+                segments.append(int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]))
+        return sorted(segments)
+
+    def _open_segment(self) -> None:
+        self._file = open(self._segment_path(self._segment), 'ab')
+
+    def _replay(self, segment: int, records: Dict[str, Any], expirations: Dict[str, float], versions: Dict[str, int]) -> int:
+        with open(self._segment_path(segment), 'rb') as f:
+            raw = f.read()
+        replayed = 0
+        for record in self._records(raw, f"segment {segment}"):
+            replayed += 1
+            if record[0] == OP_EXPIRE:
+                expirations[record[1]] = record[2]
+                continue
+            records[record[1]] = record[2] if record[0] == OP_PUT else TOMBSTONE
+            if record[0] == OP_PUT and len(record) > 3 and record[3] is not None:
+                expirations[record[1]] = record[3]
+            else:
+                expirations.pop(record[1], None)
+            if record[0] == OP_PUT and len(record) > 4:
+                versions[record[1]] = record[4]
+            else:
+                versions.pop(record[1], None)
+        return replayed
+
+    def _records(self, raw: bytes, source: str):
+        offset = 0
+        while offset + RECORD_HEADER.size <= len(raw):
+            length, checksum = RECORD_HEADER.unpack_from(raw, offset)
+            payload = raw[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+            if len(payload) < length or zlib.crc32(payload) != checksum:
+                logger.warning(f"Torn or corrupt record in {source} at offset {offset}, ignoring the rest")
+                return
+            yield self._codec.decode(payload)
+            offset += RECORD_HEADER.size + length
+
+    def _write_snapshot(self, path: str, base: Optional[MappedSnapshot], overlay: Dict[str, Any], deleted: Set[str], first_segment: int,
+                        raw: bool, versions: Dict[str, int]) -> int:
+        count = write_snapshot(path, base, overlay, deleted, first_segment, raw, versions)
+        if hasattr(os, 'O_DIRECTORY'):
+            fd = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        return count
+
+    def _open_snapshot(self) -> Optional[MappedSnapshot]:
+        path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if not os.path.exists(path):
+            return None
+        return MappedSnapshot(path)
@@ -0,0 +1,5 @@
+from .StorageBackend import StorageBackend, MemoryBackend, RecoveredState, create_backend
+from .MappedSnapshot import MappedSnapshot, SnapshotOverlay
+from .WalBackend import WalBackend
+
+__all__ = ['StorageBackend', 'MemoryBackend', 'RecoveredState', 'MappedSnapshot', 'SnapshotOverlay', 'WalBackend', 'create_backend']
\ No newline at end of file
@@ -0,0 +1,120 @@
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, "..")
+
+from main import run_node
+from core.DataStore import DataStore
+from network.RpcClient import RPCClient
+from storage.WalBackend import WalBackend
+from config.Settings import NetworkSettings, StorageSettings
+
+BASE_PORT = NetworkSettings.STARTING_PORT
+HOST = NetworkSettings.IP_ADDRESS
+
+WRITE_KEYS = 5000
+WRITE_CONCURRENCY = [1, 16, 256]
+RESTART_KEYS = [10000, 100000]
+RESTART_OVERWRITES = 5
+VALUE = "x" * 100
+NODE_KEYS = 2000
+
+
+async def write_throughput(backend_name: str, concurrency: int, directory: str) -> float:
+    if backend_name == 'memory':
+        store = DataStore()
+    else:
+        store = DataStore(WalBackend(directory))
+    queue = asyncio.Queue()
+    for i in range(WRITE_KEYS):
+        queue.put_nowait(f"key{i}")
+
+    async def writer():
+        while not queue.empty():
+            key = queue.get_nowait()
+            store.store(key, VALUE)
+            await store.sync()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(writer() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    store.close()
+    return WRITE_KEYS / elapsed
+
+
+async def restart_time(keys: int, directory: str, snapshot: bool) -> float:
+    store = DataStore(WalBackend(directory))
+    for round_number in range(RESTART_OVERWRITES):
+        for i in range(keys):
+            store.store(f"key{i}", f"{VALUE}{round_number}")
+    await store.sync()
+    if snapshot:
+        await store.checkpoint(force=True)
+    store.close()
+    started = time.perf_counter()
+    recovered = DataStore(WalBackend(directory))
+    elapsed = time.perf_counter() - started
+    assert len(recovered.data) == keys, f"recovered {len(recovered.data)} of {keys} keys"
+    recovered.close()
+    return elapsed
+
+
+async def node_restart(directory: str) -> None:
+    rpc = RPCClient()
+    StorageSettings.DATA_DIR = os.path.join(directory, "nodes")
+
+    task = asyncio.create_task(run_node(HOST, BASE_PORT, storage='wal'))
+    await asyncio.sleep(1)
+    items = {f"node_key{i}": VALUE for i in range(NODE_KEYS)}
+    await rpc.send_request(HOST, BASE_PORT, "MULTI_STORE", {"data": items}, timeout=60)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+    started = time.perf_counter()
+    task = asyncio.create_task(run_node(HOST, BASE_PORT, storage='wal'))
+    status = None
+    while status is None and time.perf_counter() - started < 10:
+        await asyncio.sleep(0.05)
+        status = await rpc.send_request(HOST, BASE_PORT, "GET_STATUS", {})
+    elapsed = time.perf_counter() - started
+    print(f"   Node restart: {status['keys_count'] if status else 0}/{NODE_KEYS} keys back after {elapsed:.2f}s")
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def run_storage_benchmark():
+    print("=" * 70)
+    print("CHORD STORAGE BENCHMARK - WAL + SNAPSHOT")
+    print("=" * 70)
+
+    directory = tempfile.mkdtemp(prefix="chord_storage_")
+    try:
+        print(f"\nWrite throughput ({WRITE_KEYS} keys, durable ack after group commit)")
+        for concurrency in WRITE_CONCURRENCY:
+            memory = await write_throughput('memory', concurrency, directory)
+            wal_dir = os.path.join(directory, f"write_{concurrency}")
+            wal = await write_throughput('wal', concurrency, wal_dir)
+            print(f"   concurrency={concurrency:4d}  memory={memory:10.0f} ops/s  wal={wal:10.0f} ops/s")
+
+        print(f"\nRestart time (recovery of the data store, {RESTART_OVERWRITES} writes per key)")
+        for keys in RESTART_KEYS:
+            log_only = await restart_time(keys, os.path.join(directory, f"log_{keys}"), snapshot=False)
+            with_snapshot = await restart_time(keys, os.path.join(directory, f"snap_{keys}"), snapshot=True)
+            print(f"   keys={keys:6d}  WAL replay={log_only:.3f}s  snapshot={with_snapshot:.3f}s")
+
+        print("\nSingle node restart with storage='wal'")
+        await node_restart(directory)
+        print("\nSTORAGE BENCHMARK COMPLETED")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_storage_benchmark())
+    except KeyboardInterrupt:
+        pass
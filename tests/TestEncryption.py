@@ -31,6 +31,32 @@ def run_encryption_test():
     assert decrypted == message, "Decrypted message does not match"
     print(f"Decrypted: {decrypted}")
     print("Encryption/decryption is functional")
+    print("\n   Test sealed frames (AES-GCM)...")
+    frame = security.seal_frame(b"raw serialized frame")
+    print(f"   Sealed ({len(frame)} bytes): {frame[:40].hex()}...")
+    assert security.open_frame(frame) == b"raw serialized frame", "Opened frame does not match"
+    tampered = frame[:-1] + bytes([frame[-1] ^ 1])
+    try:
+        security.open_frame(tampered)
+        assert False, "Tampered frame should be rejected"
+    except ValueError:
+        print("   Frame tampering detected")
+    print("Sealed framing is functional")
+    print("\n   Test session keys (per-connection AEAD)...")
+    client_nonce = security.new_session_nonce()
+    server_nonce = security.new_session_nonce()
+    client = security.derive_session("aes-gcm", client_nonce, server_nonce, is_client=True)
+    server = security.derive_session("aes-gcm", client_nonce, server_nonce, is_client=False)
+    first = client.seal(b"first frame")
+    second = client.seal(b"second frame")
+    assert server.open(first) == b"first frame", "First session frame does not match"
+    assert server.open(second) == b"second frame", "Second session frame does not match"
+    try:
+        server.open(first)
+        assert False, "Replayed frame should be rejected"
+    except ValueError:
+        print("   Frame replay detected")
+    print("Session keys are functional")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,26 @@
+import time
+
+LOGICAL_BITS = 16
+LOGICAL_MASK = (1 << LOGICAL_BITS) - 1
+
+
+class HybridClock:
+
+    def __init__(self):
+        self.last = 0
+
+    def now(self) -> int:
+        self.last = max(self.last + 1, (time.time_ns() // 1_000_000) << LOGICAL_BITS)
+        return self.last
+
+    def observe(self, timestamp: int) -> None:
+        if timestamp > self.last:
+            self.last = timestamp
+
+    @staticmethod
+    def physical_ms(timestamp: int) -> int:
+        return timestamp >> LOGICAL_BITS
+
+    @staticmethod
+    def logical(timestamp: int) -> int:
+        return timestamp & LOGICAL_MASK
@@ -1,3 +1,4 @@
 from .ChordMath import ChordMath
+from .HybridClock import HybridClock
 
-__all__ = ['ChordMath']
\ No newline at end of file
+__all__ = ['ChordMath', 'HybridClock']
\ No newline at end of file